@@ -0,0 +1,25 @@
+"""plan candidates
+
+Revision ID: 0004_plan_candidates
+Revises: 0003_job_progress_fields
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_plan_candidates"
+down_revision = "0003_job_progress_fields"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("plans", sa.Column("candidates_json", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("plans", "candidates_json")
@@ -0,0 +1,29 @@
+"""alert next_check_at
+
+Revision ID: 0005_alert_next_check_at
+Revises: 0004_plan_candidates
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_alert_next_check_at"
+down_revision = "0004_plan_candidates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("alerts", sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE alerts SET next_check_at = CURRENT_TIMESTAMP")
+    op.alter_column("alerts", "next_check_at", nullable=False)
+    op.create_index("ix_alerts_due", "alerts", ["is_active", "next_check_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_due", table_name="alerts")
+    op.drop_column("alerts", "next_check_at")
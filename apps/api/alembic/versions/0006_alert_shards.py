@@ -0,0 +1,49 @@
+"""alert shards
+
+Revision ID: 0006_alert_shards
+Revises: 0005_alert_next_check_at
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import zlib
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_alert_shards"
+down_revision = "0005_alert_next_check_at"
+branch_labels = None
+depends_on = None
+
+_ALERT_SHARDS = 1024
+_BATCH = 5000
+
+
+def upgrade() -> None:
+    op.add_column("alerts", sa.Column("shard", sa.SmallInteger(), nullable=True))
+    bind = op.get_bind()
+    alerts = sa.table("alerts", sa.column("id", sa.String), sa.column("shard", sa.SmallInteger))
+    last_id = ""
+    while True:
+        ids = bind.execute(
+            sa.select(alerts.c.id).where(alerts.c.id > last_id).order_by(alerts.c.id).limit(_BATCH)
+        ).scalars().all()
+        if not ids:
+            break
+        bind.execute(
+            alerts.update().where(alerts.c.id == sa.bindparam("alert_id")).values(shard=sa.bindparam("alert_shard")),
+            [{"alert_id": i, "alert_shard": zlib.crc32(i.encode("utf-8")) % _ALERT_SHARDS} for i in ids],
+        )
+        last_id = ids[-1]
+    op.alter_column("alerts", "shard", nullable=False)
+    op.drop_index("ix_alerts_due", table_name="alerts")
+    op.create_index("ix_alerts_shard_due", "alerts", ["is_active", "shard", "next_check_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_shard_due", table_name="alerts")
+    op.create_index("ix_alerts_due", "alerts", ["is_active", "next_check_at", "id"])
+    op.drop_column("alerts", "shard")
@@ -0,0 +1,48 @@
+"""price history
+
+Revision ID: 0007_price_history
+Revises: 0006_alert_shards
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_price_history"
+down_revision = "0006_alert_shards"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_points",
+        sa.Column("trip_id", sa.String(length=36), primary_key=True),
+        sa.Column("alert_type", sa.String(length=16), primary_key=True),
+        sa.Column("observed_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("price", sa.Numeric, nullable=False),
+    )
+    op.create_index("ix_price_points_observed_at", "price_points", ["observed_at"])
+
+    op.create_table(
+        "price_rollups",
+        sa.Column("trip_id", sa.String(length=36), primary_key=True),
+        sa.Column("alert_type", sa.String(length=16), primary_key=True),
+        sa.Column("granularity", sa.String(length=8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("min_price", sa.Numeric, nullable=False),
+        sa.Column("max_price", sa.Numeric, nullable=False),
+        sa.Column("last_price", sa.Numeric, nullable=False),
+        sa.Column("sample_count", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_price_rollups_granularity_bucket", "price_rollups", ["granularity", "bucket_start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_price_rollups_granularity_bucket", table_name="price_rollups")
+    op.drop_table("price_rollups")
+    op.drop_index("ix_price_points_observed_at", table_name="price_points")
+    op.drop_table("price_points")
@@ -0,0 +1,51 @@
+"""trip latest-row indexes
+
+Revision ID: 0008_trip_latest_indexes
+Revises: 0007_price_history
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_trip_latest_indexes"
+down_revision = "0007_price_history"
+branch_labels = None
+depends_on = None
+
+
+_TABLES = ("plans", "itineraries", "agent_runs")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("agent_runs"):
+        # The model shipped without a migration; databases built only from migrations never got the table.
+        op.create_table(
+            "agent_runs",
+            sa.Column("id", sa.String(length=36), primary_key=True),
+            sa.Column("trip_id", sa.String(length=36), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, index=True),
+            sa.Column("phase", sa.String(length=32), nullable=False, index=True),
+            sa.Column("input_json", sa.JSON, nullable=False),
+            sa.Column("output_json", sa.JSON, nullable=False),
+            sa.Column("tool_calls_json", sa.JSON, nullable=False),
+            sa.Column("model_info", sa.JSON, nullable=False),
+            sa.Column("prompt_version", sa.String(length=64), nullable=False),
+            sa.Column("commit_hash", sa.String(length=64), nullable=False),
+        )
+        inspector = sa.inspect(op.get_bind())
+    for table in _TABLES:
+        op.create_index(f"ix_{table}_trip_created", table, ["trip_id", sa.text("created_at DESC")])
+        # The composite index's leading column serves every trip_id lookup the old index did.
+        if any(ix["name"] == f"ix_{table}_trip_id" for ix in inspector.get_indexes(table)):
+            op.drop_index(f"ix_{table}_trip_id", table_name=table)
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.create_index(f"ix_{table}_trip_id", table, ["trip_id"])
+        op.drop_index(f"ix_{table}_trip_created", table_name=table)
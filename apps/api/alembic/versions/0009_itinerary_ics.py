@@ -0,0 +1,26 @@
+"""itinerary ics
+
+Revision ID: 0009_itinerary_ics
+Revises: 0008_trip_latest_indexes
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_itinerary_ics"
+down_revision = "0008_trip_latest_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left NULL for existing rows; the export endpoint renders those on demand.
+    op.add_column("itineraries", sa.Column("itinerary_ics", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("itineraries", "itinerary_ics")
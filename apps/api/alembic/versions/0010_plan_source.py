@@ -0,0 +1,26 @@
+"""plan source
+
+Revision ID: 0010_plan_source
+Revises: 0009_itinerary_ics
+Create Date: 2026-10-17
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_plan_source"
+down_revision = "0009_itinerary_ics"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reranked plans written before this keep their own candidates_json copy and still rerank from it.
+    op.add_column("plans", sa.Column("source_plan_id", sa.String(length=36), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("plans", "source_plan_id")
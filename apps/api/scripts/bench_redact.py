@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any
+
+from tripsmith.core.sanitize import redact_obj
+
+
+# The two-pass redaction this module replaced, kept here as the baseline.
+_LEGACY_EMAIL_RE = re.compile(r"(?i)\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b")
+_LEGACY_PHONE_RE = re.compile(r"(?:(?<=\D)|^)(?:\+?\d[\d\s().-]{7,}\d)(?:(?=\D)|$)")
+
+
+def _legacy_redact_obj(obj: Any) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, str):
+        return _LEGACY_PHONE_RE.sub("[REDACTED_PHONE]", _LEGACY_EMAIL_RE.sub("[REDACTED_EMAIL]", obj))
+    if isinstance(obj, (int, float, bool)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [_legacy_redact_obj(v) for v in obj]
+    if isinstance(obj, dict):
+        return {(_legacy_redact_obj(k) if isinstance(k, str) else k): _legacy_redact_obj(v) for k, v in obj.items()}
+    return str(obj)
+
+
+def _tool_output(*, items: int, pii_every: int, rng: random.Random) -> dict:
+    # Shaped like a provider search result: mostly names, ids, coordinates and free text without contact details.
+    rows = []
+    for i in range(items):
+        row = {
+            "id": f"poi-{i:06d}",
+            "name": rng.choice(["Old Town Square", "Museum of Art", "Riverside Park", "Central Market"]) + f" #{i}",
+            "location": {"lat": 50.0 + rng.random(), "lon": 14.0 + rng.random()},
+            "rating": round(rng.uniform(3, 5), 1),
+            "tags": ["sightseeing", "outdoor", "family"],
+            "opening_hours": "Mo-Fr 09:00-18:00; Sa 10:00-16:00",
+            "description": "A popular stop with a view over the river and a small cafe near the entrance. " * 3,
+        }
+        if pii_every and i % pii_every == 0:
+            row["contact"] = f"Call +420 224 {i % 1000:03d} 111 or write to desk{i}@example.org"
+        rows.append(row)
+    return {"count": items, "items": rows}
+
+
+def _best_ms(fn, payload: Any, *, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the single-pass redaction against the two-pass baseline.")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--pii-every", type=int, default=50, help="every Nth item carries a phone and an email; 0 for none")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    payload = _tool_output(items=args.items, pii_every=args.pii_every, rng=random.Random(args.seed))
+    if json.dumps(redact_obj(payload)) != json.dumps(_legacy_redact_obj(payload)):
+        raise SystemExit("redaction output differs from the baseline")
+
+    legacy_ms = _best_ms(_legacy_redact_obj, payload, repeat=args.repeat)
+    current_ms = _best_ms(redact_obj, payload, repeat=args.repeat)
+    print(
+        json.dumps(
+            {
+                "items": args.items,
+                "payload_bytes": len(json.dumps(payload)),
+                "pii_every": args.pii_every,
+                "legacy_ms": round(legacy_ms, 2),
+                "single_pass_ms": round(current_ms, 2),
+                "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+                "clean_payload_shared": redact_obj(payload) is payload,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,33 @@ import time
 import httpx
 
 
+def _stream_job(client: httpx.Client, *, api: str, job_id: str, user_id: str, timeout_seconds: int) -> dict | None:
+    try:
+        with client.stream(
+            "GET",
+            f"{api}/api/jobs/{job_id}/events",
+            headers={"X-User-Id": user_id},
+            timeout=httpx.Timeout(10, read=timeout_seconds),
+        ) as resp:
+            if resp.status_code != 200:
+                return None
+            event = None
+            for line in resp.iter_lines():
+                if line.startswith("event:"):
+                    event = line.split(":", 1)[1].strip()
+                elif line.startswith("data:") and event == "job":
+                    body = json.loads(line.split(":", 1)[1])
+                    if body.get("status") in ("succeeded", "failed"):
+                        return body
+    except httpx.HTTPError:
+        return None
+    return None
+
+
 def _wait_job(client: httpx.Client, *, api: str, job_id: str, user_id: str, timeout_seconds: int = 120) -> dict:
+    body = _stream_job(client, api=api, job_id=job_id, user_id=user_id, timeout_seconds=timeout_seconds)
+    if body is not None:
+        return body
     deadline = time.time() + timeout_seconds
     while time.time() < deadline:
         j = client.get(f"{api}/api/jobs/{job_id}", headers={"X-User-Id": user_id})
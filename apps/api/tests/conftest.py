@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+import uuid
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -12,6 +13,7 @@ from fastapi.testclient import TestClient
 import fakeredis
 
 from tripsmith.main import create_app
+from tripsmith.main import async_redis_dep
 from tripsmith.main import redis_dep
 from tripsmith.core import db as db_core
 from tripsmith.core.db import get_db
@@ -24,16 +26,19 @@ from tripsmith.models.trip import Trip
 from tripsmith.models.agent_run import AgentRun
 from tripsmith.models.job import Job
 from tripsmith.models.saved_plan import SavedPlan
+from tripsmith.models.price_history import PricePoint
+from tripsmith.models.price_history import PriceRollup
 
 
-_MODEL_IMPORTS = (Trip, Plan, Itinerary, Alert, Notification, AgentRun, Job, SavedPlan)
+_MODEL_IMPORTS = (Trip, Plan, Itinerary, Alert, Notification, AgentRun, Job, SavedPlan, PricePoint, PriceRollup)
 
 
 @pytest.fixture()
 def client():
     os.environ["CELERY_ALWAYS_EAGER"] = "1"
     os.environ["FAKE_REDIS"] = "1"
-    db_core.reconfigure_engine("sqlite+pysqlite:///:memory:")
+    # Named shared-cache memory database so the sync and async engines see the same tables.
+    db_core.reconfigure_engine(f"sqlite+pysqlite:///file:{uuid.uuid4().hex}?mode=memory&cache=shared&uri=true")
     Base.metadata.create_all(bind=db_core.engine)
 
     app = create_app()
@@ -45,10 +50,12 @@ def client():
         finally:
             db.close()
 
-    r = fakeredis.FakeRedis(decode_responses=True)
+    server = fakeredis.FakeServer()
+    r = fakeredis.FakeRedis(server=server, decode_responses=True)
 
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[redis_dep] = lambda: r
+    app.dependency_overrides[async_redis_dep] = lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
 
     return TestClient(app)
 
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import datetime as dt
+from types import SimpleNamespace
+
+from tripsmith import worker
+from tripsmith.core import db as db_core
+from tripsmith.core.config import settings
+from tripsmith.core.ids import new_id
+from tripsmith.core.price_history import prune_expired_prices
+from tripsmith.core.price_history import record_prices
+from tripsmith.models.alert import ALERT_SHARDS
+from tripsmith.models.alert import Alert
+from tripsmith.models.alert import alert_shard
+from tripsmith.models.notification import Notification
+from tripsmith.models.trip import Trip
+
+
+def _trip(db, *, destination: str) -> str:
+    trip_id = new_id()
+    db.add(
+        Trip(
+            id=trip_id,
+            user_id="u",
+            created_at=dt.datetime.now(dt.timezone.utc),
+            origin="SFO",
+            destination=destination,
+            start_date=dt.date(2030, 1, 1),
+            end_date=dt.date(2030, 1, 5),
+            flexible_days=0,
+            budget_total=1800,
+            currency="USD",
+            travelers=1,
+            preferences={},
+        )
+    )
+    return trip_id
+
+
+def _alert(db, trip_id: str, *, threshold: float, next_check_at: dt.datetime, active: bool = True) -> str:
+    alert_id = new_id()
+    db.add(
+        Alert(
+            id=alert_id,
+            trip_id=trip_id,
+            type="flight",
+            threshold=threshold,
+            frequency_minutes=60,
+            last_checked_at=None,
+            next_check_at=next_check_at,
+            is_active=active,
+        )
+    )
+    return alert_id
+
+
+def test_refresh_alerts_batches_due_alerts_and_prices_each_route_once(client, monkeypatch):
+    now = dt.datetime.now(dt.timezone.utc)
+    past = now - dt.timedelta(minutes=5)
+    db = db_core.SessionLocal()
+    try:
+        paris = [_trip(db, destination="PAR") for _ in range(3)]
+        rome = _trip(db, destination="ROM")
+        due = [_alert(db, t, threshold=1000, next_check_at=past) for t in paris]
+        due.append(_alert(db, rome, threshold=10, next_check_at=past))
+        later = _alert(db, paris[0], threshold=1000, next_check_at=now + dt.timedelta(hours=1))
+        inactive = _alert(db, paris[0], threshold=1000, next_check_at=past, active=False)
+        db.commit()
+    finally:
+        db.close()
+
+    priced: list[tuple] = []
+
+    def fake_price(route, *, now):
+        priced.append(route)
+        return 200.0
+
+    monkeypatch.setattr(worker, "_route_price", fake_price)
+    monkeypatch.setattr(settings, "alert_batch_size", 2)
+
+    assert worker.refresh_alert_shards(0, ALERT_SHARDS) == 4
+    assert len(priced) == 2
+
+    db = db_core.SessionLocal()
+    try:
+        notified = {n.alert_id for n in db.query(Notification).all()}
+        assert notified == set(due[:3])
+        alerts = {a.id: a for a in db.query(Alert).all()}
+        for alert_id in due:
+            assert alerts[alert_id].last_checked_at is not None
+        assert alerts[later].last_checked_at is None
+        assert alerts[inactive].last_checked_at is None
+    finally:
+        db.close()
+
+    assert worker.refresh_alert_shards(0, ALERT_SHARDS) == 0
+
+
+def test_refresh_alerts_fans_out_over_shards_and_checks_each_alert_once(client, monkeypatch):
+    past = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=5)
+    db = db_core.SessionLocal()
+    try:
+        trip_id = _trip(db, destination="PAR")
+        alert_ids = [_alert(db, trip_id, threshold=1000, next_check_at=past) for _ in range(40)]
+        db.commit()
+        assert {a.shard for a in db.query(Alert).all()} == {alert_shard(i) for i in alert_ids}
+    finally:
+        db.close()
+
+    shards_run: list[tuple[int, int]] = []
+    run_shards = worker.refresh_alert_shards.run
+
+    def tracking(first_shard, end_shard):
+        shards_run.append((first_shard, end_shard))
+        return run_shards(first_shard, end_shard)
+
+    monkeypatch.setattr(worker.celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker.refresh_alert_shards, "run", tracking)
+    monkeypatch.setattr(settings, "alert_shard_count", 8)
+
+    assert worker.refresh_alerts() == 8
+    assert worker.refresh_alerts() == 8
+    assert len(shards_run) == 16
+    assert shards_run[0][0] == 0 and shards_run[7][1] == ALERT_SHARDS
+
+    db = db_core.SessionLocal()
+    try:
+        notified = [n.alert_id for n in db.query(Notification).all()]
+    finally:
+        db.close()
+    assert sorted(notified) == sorted(alert_ids)
+
+
+
+def test_alert_checks_build_price_history_rollups(client, monkeypatch):
+    base = dt.datetime(2030, 1, 1, 9, 15, tzinfo=dt.timezone.utc)
+    db = db_core.SessionLocal()
+    try:
+        trip_id = _trip(db, destination="PAR")
+        _alert(db, trip_id, threshold=1, next_check_at=base - dt.timedelta(minutes=1))
+        db.commit()
+    finally:
+        db.close()
+
+    clock = {"now": base}
+
+    class _Clock(dt.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+
+    quotes = iter([300.0, 280.0])
+    priced: list[dt.datetime] = []
+
+    def fake_price(route, *, now):
+        priced.append(now)
+        return next(quotes)
+
+    monkeypatch.setattr(worker, "_route_price", fake_price)
+    monkeypatch.setattr(worker, "dt", SimpleNamespace(datetime=_Clock, timedelta=dt.timedelta, timezone=dt.timezone))
+    for minutes in (0, 20, 70):
+        clock["now"] = base + dt.timedelta(minutes=minutes)
+        db = db_core.SessionLocal()
+        try:
+            db.query(Alert).update({Alert.next_check_at: clock["now"] - dt.timedelta(seconds=1)})
+            db.commit()
+        finally:
+            db.close()
+        assert worker.refresh_alert_shards(0, ALERT_SHARDS) == 1
+    monkeypatch.undo()
+
+    # The 09:35 check reuses the 09:00 rollup instead of pricing the route again.
+    assert priced == [base, base + dt.timedelta(minutes=70)]
+
+    db = db_core.SessionLocal()
+    try:
+        record_prices(db, {(trip_id, "flight"): 250.0}, observed_at=base + dt.timedelta(minutes=30))
+        db.commit()
+    finally:
+        db.close()
+
+    resp = client.get(f"/api/trips/{trip_id}/price_history", params={"granularity": "hour"}, headers={"X-User-Id": "u"})
+    assert resp.status_code == 200
+    buckets = resp.json()["buckets"]
+    assert [(b["min_price"], b["max_price"], b["last_price"], b["sample_count"]) for b in buckets] == [
+        (250.0, 300.0, 250.0, 2),
+        (280.0, 280.0, 280.0, 1),
+    ]
+    day = client.get(f"/api/trips/{trip_id}/price_history", params={"granularity": "day"}, headers={"X-User-Id": "u"}).json()
+    assert [(b["min_price"], b["max_price"], b["sample_count"]) for b in day["buckets"]] == [(250.0, 300.0, 3)]
+    assert client.get(f"/api/trips/{trip_id}/price_history", headers={"X-User-Id": "other"}).status_code == 404
+
+    db = db_core.SessionLocal()
+    try:
+        removed = prune_expired_prices(db, now=base + dt.timedelta(days=3650))
+    finally:
+        db.close()
+    assert removed == {"points": 3, "hourly": 2, "daily": 1}
+
+
+def test_record_prices_upserts_rows_in_key_order(client):
+    db = db_core.SessionLocal()
+    executed: list[list[dict]] = []
+    execute = db.execute
+
+    def capture(stmt, params=None, *args, **kwargs):
+        if isinstance(params, list):
+            executed.append(params)
+        return execute(stmt, params, *args, **kwargs)
+
+    db.execute = capture
+    try:
+        prices = {("t3", "flight"): 1.0, ("t1", "stay"): 2.0, ("t1", "flight"): 3.0}
+        record_prices(db, prices, observed_at=dt.datetime(2030, 1, 1, 9, 15, tzinfo=dt.timezone.utc))
+        db.rollback()
+    finally:
+        db.close()
+    points, rollups = executed
+    assert [(p["trip_id"], p["alert_type"]) for p in points] == sorted(prices)
+    keys = [(r["trip_id"], r["alert_type"], r["granularity"], r["bucket_start"]) for r in rollups]
+    assert keys == sorted(keys)
+    assert len(keys) == 6
@@ -2,9 +2,17 @@ from __future__ import annotations
 
 import datetime as dt
 
+from sqlalchemy import event
+from sqlalchemy.orm import undefer
+
 from tripsmith.core import db as db_core
+from tripsmith.core.config import settings
 from tripsmith.core.ids import new_id
+from tripsmith.core.job_progress import write_progress
+from tripsmith.main import redis_dep
+from tripsmith.models.itinerary import Itinerary
 from tripsmith.models.job import Job
+from tripsmith.models.plan import Plan
 from tripsmith.worker import run_plan_job
 
 
@@ -172,3 +180,229 @@ def test_export_md_contains_heading(client):
     assert resp.status_code == 200
     assert resp.text.startswith("# TripSmith Itinerary")
 
+
+
+def test_rerank_reuses_stored_candidates_without_a_job(client):
+    h = {"X-User-Id": "u"}
+    trip_id = client.post("/api/trips", json=_trip_payload(), headers=h).json()["id"]
+    c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers=h).json()["constraints"]
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+    first = client.get(f"/api/trips/{trip_id}", headers=h).json()
+
+    c["max_transfer_count"] = 0
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    resp = client.post(f"/api/trips/{trip_id}/plan/rerank", headers=h)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["plan_id"] != first["latest_plan_id"]
+    for opt in body["plans_json"]["options"]:
+        assert opt["flight"]["stops"] == 0
+    assert client.get(f"/api/trips/{trip_id}", headers=h).json()["latest_plan_id"] == body["plan_id"]
+
+    # Reranking a reranked plan still reads the one stored candidate set, and never copies it.
+    c["max_transfer_count"] = 2
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    again = client.post(f"/api/trips/{trip_id}/plan/rerank", headers=h)
+    assert again.status_code == 200
+    db = db_core.SessionLocal()
+    try:
+        rows = {p.id: p for p in db.query(Plan).options(undefer(Plan.candidates_json)).filter(Plan.trip_id == trip_id)}
+    finally:
+        db.close()
+    for plan_id in (body["plan_id"], again.json()["plan_id"]):
+        assert rows[plan_id].candidates_json is None
+        assert rows[plan_id].source_plan_id == first["latest_plan_id"]
+    assert rows[first["latest_plan_id"]].candidates_json
+
+
+def test_running_job_reads_progress_from_redis(client):
+    job_id = new_id()
+    now = dt.datetime.now(dt.timezone.utc)
+    db = db_core.SessionLocal()
+    try:
+        db.add(
+            Job(
+                id=job_id,
+                trip_id="t",
+                user_id="u",
+                type="plan",
+                status="queued",
+                stage="QUEUED",
+                progress=0,
+                message="Queued",
+                result_json=None,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    redis = client.app.dependency_overrides[redis_dep]()
+    write_progress(redis, job_id, status="running", stage="GENERATE", progress=45, message="Generating plans")
+    job = client.get(f"/api/jobs/{job_id}", headers={"X-User-Id": "u"}).json()
+    assert (job["status"], job["stage"], job["progress"]) == ("running", "GENERATE", 45)
+
+    db = db_core.SessionLocal()
+    try:
+        row = db.query(Job).filter(Job.id == job_id).one()
+        row.status = "failed"
+        row.stage = "FAILED"
+        db.commit()
+    finally:
+        db.close()
+    job = client.get(f"/api/jobs/{job_id}", headers={"X-User-Id": "u"}).json()
+    assert (job["status"], job["stage"]) == ("failed", "FAILED")
+
+
+def test_saved_plans_round_trip(client):
+    h = {"X-User-Id": "u"}
+    trip_id = client.post("/api/trips", json=_trip_payload(), headers=h).json()["id"]
+    c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers=h).json()["constraints"]
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+    plan_id = client.get(f"/api/trips/{trip_id}", headers=h).json()["latest_plan_id"]
+
+    for index, label in ((0, "cheap one"), (2, "comfy one")):
+        resp = client.post(f"/api/trips/{trip_id}/saved_plans", json={"plan_id": plan_id, "plan_index": index, "label": label}, headers=h)
+        assert resp.status_code == 200
+    saved = client.get(f"/api/trips/{trip_id}/saved_plans", headers=h).json()["saved_plans"]
+    assert sorted(s["label"] for s in saved) == ["cheap one", "comfy one"]
+    assert client.get(f"/api/trips/{trip_id}/saved_plans", headers={"X-User-Id": "other"}).status_code == 404
+
+
+def test_get_trip_loads_trip_and_latest_plan_in_one_statement(client):
+    h = {"X-User-Id": "u"}
+    trip_id = client.post("/api/trips", json=_trip_payload(), headers=h).json()["id"]
+    c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers=h).json()["constraints"]
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_core.async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        body = client.get(f"/api/trips/{trip_id}", headers=h).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(statements) == 1
+
+    db = db_core.SessionLocal()
+    try:
+        newest = db.query(Plan).filter(Plan.trip_id == trip_id).order_by(Plan.created_at.desc()).first()
+    finally:
+        db.close()
+    assert body["latest_plan_id"] == newest.id
+    assert client.get(f"/api/trips/{trip_id}", headers={"X-User-Id": "other"}).status_code == 404
+
+
+def test_conditional_get_and_cached_calendar(client):
+    h = {"X-User-Id": "u"}
+    trip_id = client.post("/api/trips", json=_trip_payload(), headers=h).json()["id"]
+    c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers=h).json()["constraints"]
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+
+    trip = client.get(f"/api/trips/{trip_id}", headers=h)
+    etag = trip.headers["ETag"]
+    assert client.get(f"/api/trips/{trip_id}", headers={**h, "If-None-Match": etag}).status_code == 304
+    client.post(f"/api/trips/{trip_id}/itinerary", json={"plan_index": 0}, headers=h)
+    client.post(f"/api/trips/{trip_id}/plan", headers=h)
+    assert client.get(f"/api/trips/{trip_id}", headers={**h, "If-None-Match": etag}).status_code == 200
+
+    first = client.get(f"/api/trips/{trip_id}/export/ics", headers=h)
+    assert first.status_code == 200
+    ics_etag = first.headers["ETag"]
+    redis = client.app.dependency_overrides[redis_dep]()
+    # Served from the ICS stored by the worker, so nothing needed rendering.
+    assert not redis.keys("export:ics:*")
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_core.async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        again = client.get(f"/api/trips/{trip_id}/export/ics", headers=h)
+        unchanged = client.get(f"/api/trips/{trip_id}/export/ics", headers={**h, "If-None-Match": f"W/{ics_etag}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert again.text == first.text
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == ics_etag
+    assert len(statements) == 2
+
+    # Rows written before itinerary_ics existed are rendered once and then served from Redis.
+    db = db_core.SessionLocal()
+    try:
+        db.query(Itinerary).filter(Itinerary.trip_id == trip_id).update({Itinerary.itinerary_ics: None})
+        db.commit()
+    finally:
+        db.close()
+    legacy = client.get(f"/api/trips/{trip_id}/export/ics", headers=h)
+    assert legacy.text == first.text
+    assert redis.keys("export:ics:*")
+
+    md = client.get(f"/api/trips/{trip_id}/export/md", headers=h)
+    assert md.headers["ETag"] != ics_etag
+    assert client.get(f"/api/trips/{trip_id}/export/md", headers={**h, "If-None-Match": md.headers["ETag"]}).status_code == 304
+
+
+def test_calendar_feed_streams_every_trip_for_a_signed_url(client, monkeypatch):
+    monkeypatch.setattr(settings, "calendar_feed_secret", "s3cret")
+    h = {"X-User-Id": "u"}
+    trip_ids = []
+    for destination in ("PAR", "ROM"):
+        trip_id = client.post("/api/trips", json={**_trip_payload(), "destination": destination}, headers=h).json()["id"]
+        c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers=h).json()["constraints"]
+        client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c}, headers=h)
+        client.post(f"/api/trips/{trip_id}/plan", headers=h)
+        client.post(f"/api/trips/{trip_id}/itinerary", json={"plan_index": 0}, headers=h)
+        trip_ids.append(trip_id)
+    client.post("/api/trips", json=_trip_payload(), headers=h)
+
+    url = client.get("/api/calendar/feed", headers=h).json()["url"]
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/calendar")
+    body = resp.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VCALENDAR") == 1
+    for trip_id in trip_ids:
+        single = client.get(f"/api/trips/{trip_id}/export/ics", headers=h).text
+        assert single.count("BEGIN:VEVENT") == body.count(f"UID:{trip_id}-")
+
+    assert "SEQUENCE:" in body and "LAST-MODIFIED:" in body
+
+    etag = resp.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # created_at is stamped before a job commits, so no date is offered and If-Modified-Since never short-circuits.
+    assert "Last-Modified" not in resp.headers
+    assert client.get(url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
+
+    # Rows stored before SEQUENCE existed are rendered from JSON into the same events.
+    db = db_core.SessionLocal()
+    try:
+        db.query(Itinerary).filter(Itinerary.trip_id == trip_ids[0]).update({Itinerary.itinerary_ics: None})
+        db.commit()
+    finally:
+        db.close()
+    assert client.get(url).text == body
+
+    client.post(f"/api/trips/{trip_ids[1]}/itinerary", json={"plan_index": 1}, headers=h)
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert client.get(url, headers={"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}).status_code == 200
+
+    assert client.get(url.replace("user_id=u", "user_id=other")).status_code == 404
+    assert client.get("/api/calendar/feed.ics", params={"user_id": "u", "token": "0" * 32}).status_code == 404
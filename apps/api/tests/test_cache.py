@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import fakeredis
+import httpx
+import pytest
+
+from tripsmith.core.cache import CacheStats
+from tripsmith.core.cache import CachedProviderError
+from tripsmith.core.cache import LocalCache
+from tripsmith.core.cache import ProviderCache
+
+
+def _cache(redis, **kwargs) -> ProviderCache:
+    stats = kwargs.pop("stats", None) or CacheStats()
+    local = LocalCache(max_entries=64, max_bytes=1024 * 1024, stats=stats)
+    return ProviderCache(redis, local=local, stats=stats, **kwargs)
+
+
+def _counting_fetch(value, *, delay: float = 0.05):
+    calls = {"n": 0}
+
+    async def fn():
+        calls["n"] += 1
+        await asyncio.sleep(delay)
+        return value
+
+    return fn, calls
+
+
+def test_concurrent_misses_fetch_once():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        cache = _cache(redis)
+        fn, calls = _counting_fetch({"route": "SFO-PAR"})
+        results = await asyncio.gather(*(cache.get_or_fetch(key="k", ttl_seconds=60, fn=fn) for _ in range(20)))
+        return results, calls["n"]
+
+    results, n = asyncio.run(run())
+    assert n == 1
+    assert all(r == {"route": "SFO-PAR"} for r in results)
+
+
+def test_redis_lock_deduplicates_across_cache_instances():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        workers = [_cache(redis) for _ in range(4)]
+        fn, calls = _counting_fetch([1, 2, 3], delay=0.1)
+        results = await asyncio.gather(*(w.get_or_fetch(key="k", ttl_seconds=60, fn=fn) for w in workers))
+        return results, calls["n"]
+
+    results, n = asyncio.run(run())
+    assert n == 1
+    assert results == [[1, 2, 3]] * 4
+
+
+def test_provider_failures_are_negatively_cached():
+    calls = {"n": 0}
+
+    async def failing():
+        calls["n"] += 1
+        raise RuntimeError("upstream 503")
+
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        stats = CacheStats()
+        cache = _cache(redis, negative_ttl_seconds=30, stats=stats)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch(key="k", ttl_seconds=60, fn=failing)
+        with pytest.raises(CachedProviderError):
+            await cache.get_or_fetch(key="k", ttl_seconds=60, fn=failing)
+        return stats
+
+    stats = asyncio.run(run())
+    assert calls["n"] == 1
+    assert stats.fetch_errors == 1
+    assert stats.negative_hits == 1
+
+
+def test_entry_near_expiry_is_refreshed_early():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        stats = CacheStats()
+        cache = _cache(redis, beta=1000.0, stats=stats)
+        await redis.setex("k", 60, json.dumps({"v": "old", "delta": 1.0, "exp": time.time() + 1}))
+        fn, calls = _counting_fetch("new", delay=0)
+        first = await cache.get_or_fetch(key="k", ttl_seconds=60, fn=fn)
+        second = await _cache(redis, beta=0, stats=stats).get_or_fetch(key="k", ttl_seconds=60, fn=fn)
+        return first, second, calls["n"], stats
+
+    first, second, n, stats = asyncio.run(run())
+    assert first == "new"
+    assert second == "new"
+    assert n == 1
+    assert stats.early_refreshes == 1
+
+
+def test_local_tier_serves_repeat_reads_without_redis():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        stats = CacheStats()
+        cache = _cache(redis, stats=stats)
+        fn, calls = _counting_fetch({"items": [1, 2]}, delay=0)
+        await cache.get_or_fetch(key="k", ttl_seconds=60, fn=fn)
+        await redis.flushall()
+        value = await cache.get_or_fetch(key="k", ttl_seconds=60, fn=fn)
+        return value, calls["n"], stats
+
+    value, n, stats = asyncio.run(run())
+    assert value == {"items": [1, 2]}
+    assert n == 1
+    assert stats.local_hits == 1
+
+
+def test_pubsub_invalidation_drops_other_local_copies():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        a = _cache(redis)
+        b = _cache(redis)
+        b.start_invalidation_listener()
+        await asyncio.sleep(0.05)
+        fn_old, _ = _counting_fetch("old", delay=0)
+        await b.get_or_fetch(key="k", ttl_seconds=60, fn=fn_old)
+        await a.invalidate("k")
+        for _ in range(50):
+            if len(b.local) == 0:
+                break
+            await asyncio.sleep(0.02)
+        fn_new, _ = _counting_fetch("new", delay=0)
+        value = await b.get_or_fetch(key="k", ttl_seconds=60, fn=fn_new)
+        await b.aclose()
+        return value
+
+    assert asyncio.run(run()) == "new"
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    local = LocalCache(max_entries=10, max_bytes=100, stats=CacheStats())
+    expires = time.time() + 60
+    local.set("a", "A", size=40, expires_at=expires)
+    local.set("b", "B", size=40, expires_at=expires)
+    assert local.get("a") == "A"
+    local.set("c", "C", size=40, expires_at=expires)
+    assert len(local) == 2
+    assert local.get("b") != "B"
+    assert local.get("a") == "A"
+    assert local.get("c") == "C"
+
+
+def test_negative_entries_never_store_request_urls_with_credentials():
+    url = "https://api.opentripmap.com/0.1/en/places/radius?apikey=secret-key&radius=5000"
+
+    async def rejected():
+        request = httpx.Request("GET", url)
+        raise httpx.HTTPStatusError("Client error '403 Forbidden' for url '" + url + "'", request=request, response=httpx.Response(403, request=request))
+
+    async def unreachable():
+        raise RuntimeError(f"could not reach {url}")
+
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        cache = _cache(redis, negative_ttl_seconds=30)
+        messages = []
+        for key, fn in (("k1", rejected), ("k2", unreachable)):
+            with pytest.raises(Exception):
+                await cache.get_or_fetch(key=key, ttl_seconds=60, fn=fn)
+            with pytest.raises(CachedProviderError) as exc:
+                await cache.get_or_fetch(key=key, ttl_seconds=60, fn=fn)
+            messages.append(str(exc.value))
+        stored = [await redis.get(k) for k in await redis.keys("*")]
+        return messages, stored
+
+    messages, stored = asyncio.run(run())
+    assert messages == ["HTTPStatusError: HTTP 403", "RuntimeError: could not reach https://api.opentripmap.com/0.1/en/places/radius"]
+    assert not any("secret-key" in (value or "") for value in stored)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool
+
+from tripsmith.core import db as db_core
+from tripsmith.core.config import settings
+
+
+def test_postgres_engine_uses_configured_pool(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 12)
+    monkeypatch.setattr(settings, "db_max_overflow", 3)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 4.0)
+    monkeypatch.setattr(settings, "db_pool_recycle_seconds", 600)
+    engine = db_core._make_engine("postgresql+psycopg://u:p@localhost/tripsmith")
+    assert isinstance(engine.pool, db_core.TimedQueuePool)
+    assert engine.pool.size() == 12
+    assert engine.pool._max_overflow == 3
+    assert engine.pool._timeout == 4.0
+    assert engine.pool._recycle == 600
+    async_engine = db_core._make_async_engine("postgresql+psycopg://u:p@localhost/tripsmith")
+    assert isinstance(async_engine.sync_engine.pool, db_core.TimedAsyncQueuePool)
+    assert async_engine.sync_engine.pool.size() == 12
+
+
+def test_pgbouncer_mode_disables_pooling_and_prepared_statements(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    engine = db_core._make_engine("postgresql+psycopg://u:p@localhost/tripsmith")
+    assert isinstance(engine.pool, NullPool)
+    assert db_core._pool_kwargs(poolclass=db_core.TimedQueuePool)["connect_args"] == {"prepare_threshold": None}
+
+
+def test_timed_pool_records_waits_overflow_and_timeouts(monkeypatch):
+    stats = db_core.PoolStats()
+    monkeypatch.setattr(db_core.TimedQueuePool, "stats", stats)
+    engine = create_engine("sqlite://", poolclass=db_core.TimedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+    first = engine.connect()
+    second = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    second.close()
+    first.close()
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["overflow_peak"] == 1
+    assert snapshot["wait_ms_max"] >= 50
+
+
+def test_debug_pool_endpoint_reports_both_engines(client):
+    body = client.get("/api/debug/db/pool").json()
+    assert set(body) == {"sync", "async"}
+    assert {"pool", "checkouts", "timeouts", "wait_ms_total"} <= set(body["sync"])
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from tripsmith.agent.fanout import FanOutCall
+from tripsmith.agent.fanout import fan_out
+
+
+def _sleep_then(value, seconds: float):
+    async def fn(*_args):
+        await asyncio.sleep(seconds)
+        return value
+
+    return fn
+
+
+def test_fan_out_runs_calls_concurrently():
+    calls = [
+        FanOutCall("a", _sleep_then(1, 0.2), timeout_seconds=1),
+        FanOutCall("b", _sleep_then(2, 0.2), timeout_seconds=1),
+        FanOutCall("c", _sleep_then(3, 0.2), timeout_seconds=1),
+    ]
+    started = time.perf_counter()
+    out = asyncio.run(fan_out(calls))
+    elapsed = time.perf_counter() - started
+    assert out.values == {"a": 1, "b": 2, "c": 3}
+    assert elapsed < 0.5
+    assert {e["name"] for e in out.timeline} == {"a", "b", "c"}
+    assert all(e["status"] == "ok" for e in out.timeline)
+
+
+def test_fan_out_optional_timeout_keeps_partial_results():
+    async def dependent(value):
+        return value * 10
+
+    calls = [
+        FanOutCall("a", _sleep_then(1, 0.01), timeout_seconds=1),
+        FanOutCall("slow", _sleep_then(2, 1.0), timeout_seconds=0.05, required=False),
+        FanOutCall("after_slow", dependent, timeout_seconds=1, required=False, after="slow"),
+        FanOutCall("after_a", dependent, timeout_seconds=1, after="a"),
+    ]
+    out = asyncio.run(fan_out(calls))
+    assert out.values == {"a": 1, "after_a": 10}
+    assert isinstance(out.errors["slow"], asyncio.TimeoutError)
+    statuses = {e["name"]: e["status"] for e in out.timeline}
+    assert statuses == {"a": "ok", "after_a": "ok", "slow": "timeout", "after_slow": "skipped"}
+
+
+def test_fan_out_required_failure_cancels_in_flight_calls():
+    cancelled = asyncio.Event()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def long_running():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await fan_out(
+                [
+                    FanOutCall("boom", boom, timeout_seconds=1),
+                    FanOutCall("long", long_running, timeout_seconds=10),
+                ]
+            )
+        return cancelled.is_set()
+
+    assert asyncio.run(run()) is True
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from tripsmith.exports.ics import event_sequence
+from tripsmith.exports.ics import iter_ics
+from tripsmith.exports.ics import to_ics
+from tripsmith.schemas.itinerary import ItineraryJson
+
+
+def _itinerary(poi_name: str) -> ItineraryJson:
+    return ItineraryJson.model_validate(
+        {
+            "generated_at": "2030-01-01T00:00:00Z",
+            "plan_index": 0,
+            "days": [
+                {
+                    "date": "2030-01-02",
+                    "items": [
+                        {
+                            "period": "morning",
+                            "poi_name": poi_name,
+                            "stay_minutes": 90,
+                            "commute": {"mode": "walk", "minutes": 10},
+                            "weather_summary": "Sunny, 21°C",
+                        }
+                    ],
+                }
+            ],
+        }
+    )
+
+
+def test_long_lines_are_folded_at_75_octets_without_splitting_characters():
+    name = "Musée d’Orsay — " + "café crème et pâtisseries " * 8
+    stamp = dt.datetime(2030, 1, 1, tzinfo=dt.timezone.utc)
+    ics = to_ics(trip_id="t1", itinerary=_itinerary(name), stamp=stamp)
+    assert ics == "".join(iter_ics(trip_id="t1", itinerary=_itinerary(name), stamp=stamp))
+
+    physical = ics.split("\r\n")
+    assert physical[-1] == ""
+    assert all(len(line.encode("utf-8")) <= 75 for line in physical)
+    unfolded = ics.replace("\r\n ", "")
+    assert f"SUMMARY:{name.replace(',', chr(92) + ',')}\r\n" in unfolded
+    assert "DESCRIPTION:Sunny\\, 21°C\r\n" in unfolded
+
+
+def test_event_stamps_are_written_in_utc_whatever_the_input_zone():
+    utc = dt.datetime(2030, 1, 1, 12, 30, tzinfo=dt.timezone.utc)
+    local = utc.astimezone(dt.timezone(dt.timedelta(hours=-8)))
+    naive = utc.replace(tzinfo=None)
+    rendered = {to_ics(trip_id="t1", itinerary=_itinerary("Louvre"), stamp=stamp) for stamp in (utc, local, naive)}
+    assert len(rendered) == 1
+    ics = rendered.pop()
+    assert "DTSTAMP:20300101T123000Z\r\n" in ics
+    assert "LAST-MODIFIED:20300101T123000Z\r\n" in ics
+    assert f"SEQUENCE:{event_sequence(utc)}\r\n" in ics
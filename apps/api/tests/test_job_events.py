@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import threading
+import time
+
+import fakeredis
+
+from tripsmith.core import db as db_core
+from tripsmith.core.ids import new_id
+from tripsmith.core.job_progress import publish_job_result
+from tripsmith.core.job_progress import write_progress
+from tripsmith.main import async_redis_dep
+from tripsmith.main import redis_dep
+from tripsmith.models.job import Job
+from tripsmith.schemas.jobs import JobDto
+
+
+def _queued_job() -> str:
+    job_id = new_id()
+    now = dt.datetime.now(dt.timezone.utc)
+    db = db_core.SessionLocal()
+    try:
+        db.add(
+            Job(
+                id=job_id,
+                trip_id="t",
+                user_id="u",
+                type="plan",
+                status="queued",
+                stage="QUEUED",
+                progress=0,
+                message="Queued",
+                result_json=None,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+    return job_id
+
+
+def _finish(redis, job_id: str) -> None:
+    db = db_core.SessionLocal()
+    try:
+        row = db.query(Job).filter(Job.id == job_id).one()
+        row.status = "succeeded"
+        row.stage = "COMPLETE"
+        row.progress = 100
+        row.message = "Complete"
+        row.result_json = {"plan_id": "p1"}
+        result = JobDto.model_validate(row)
+        db.commit()
+    finally:
+        db.close()
+    publish_job_result(redis, result)
+
+
+def _events(resp) -> list[tuple[str, dict]]:
+    out: list[tuple[str, dict]] = []
+    event = None
+    for line in resp.iter_lines():
+        if line.startswith("event:"):
+            event = line.split(":", 1)[1].strip()
+        elif line.startswith("data:") and event:
+            out.append((event, json.loads(line.split(":", 1)[1])))
+    return out
+
+
+def _shared_redis(client):
+    server = fakeredis.FakeServer()
+    sync = fakeredis.FakeRedis(server=server, decode_responses=True)
+    client.app.dependency_overrides[redis_dep] = lambda: sync
+    client.app.dependency_overrides[async_redis_dep] = lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return sync
+
+
+def test_job_events_stream_progress_then_result(client):
+    redis = _shared_redis(client)
+    job_id = _queued_job()
+
+    def worker():
+        time.sleep(0.3)
+        write_progress(redis, job_id, status="running", stage="GENERATE", progress=45, message="Generating plans")
+        time.sleep(0.1)
+        _finish(redis, job_id)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    with client.stream("GET", f"/api/jobs/{job_id}/events", headers={"X-User-Id": "u"}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _events(resp)
+    t.join()
+
+    assert events[0][0] == "job" and events[0][1]["status"] == "queued"
+    assert ("progress", 45) in [(e, body.get("progress")) for e, body in events]
+    assert events[-1][0] == "job"
+    assert events[-1][1]["status"] == "succeeded"
+    assert events[-1][1]["result_json"] == {"plan_id": "p1"}
+
+
+def test_job_events_for_finished_job_returns_immediately(client):
+    redis = _shared_redis(client)
+    job_id = _queued_job()
+    _finish(redis, job_id)
+    with client.stream("GET", f"/api/jobs/{job_id}/events", params={"user_id": "u"}) as resp:
+        events = _events(resp)
+    assert [e for e, _ in events] == ["job"]
+    assert events[0][1]["stage"] == "COMPLETE"
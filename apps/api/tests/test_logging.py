@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+
+from tripsmith.core import logging as log_core
+from tripsmith.core.config import settings
+
+
+def test_format_event_redacts_strings_but_not_safe_keys_or_scalars():
+    line = json.loads(
+        log_core.format_event(
+            {"event": "contact", "request_id": "a@b.co", "note": "mail me at a@b.co", "count": 3, "nested": {"to": "x@y.org"}}
+        )
+    )
+    assert line["request_id"] == "a@b.co"
+    assert line["note"] == "mail me at [REDACTED_EMAIL]"
+    assert line["nested"] == {"to": "[REDACTED_EMAIL]"}
+    assert line["count"] == 3
+
+
+def test_log_event_is_handed_to_the_listener():
+    before = log_core.log_stats.snapshot()["enqueued"]
+    log_core.log_event("contact", request_id="r1")
+    log_core.flush_logs()
+    assert log_core.log_stats.snapshot()["enqueued"] == before + 1
+
+
+def test_full_queue_drops_instead_of_blocking_and_reports_the_gap():
+    stats = log_core.LogStats()
+    handler = log_core.DroppingQueueHandler(queue.Queue(maxsize=1), stats=stats)
+    record = logging.LogRecord("tripsmith", logging.INFO, __file__, 1, {"event": "e"}, None, None)
+    for _ in range(3):
+        handler.handle(record)
+    assert stats.snapshot()["enqueued"] == 1
+    assert stats.snapshot()["dropped"] == 2
+
+    formatted = log_core._EventFormatter(stats).format(record).splitlines()
+    assert json.loads(formatted[1])["event"] == "log_dropped"
+    assert json.loads(formatted[1])["count"] == 2
+
+
+def test_http_request_sampling_keeps_failures_and_slow_requests(monkeypatch):
+    monkeypatch.setattr(settings, "log_http_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "log_slow_request_ms", 500)
+    assert log_core._sampled_out("http_request", {"status_code": 200, "latency_ms": 3})
+    assert not log_core._sampled_out("http_request", {"status_code": 503, "latency_ms": 3})
+    assert not log_core._sampled_out("http_request", {"status_code": 200, "latency_ms": 900})
+    assert not log_core._sampled_out("job_failed", {"status_code": 200})
+    monkeypatch.setattr(settings, "log_http_sample_rate", 1.0)
+    assert not log_core._sampled_out("http_request", {"status_code": 200, "latency_ms": 3})
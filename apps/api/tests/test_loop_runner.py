@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tripsmith.core.http_client import get_http_clients
+from tripsmith.core.loop_runner import LoopRunner
+
+
+def test_loop_runner_reuses_one_loop_across_runs():
+    runner = LoopRunner(name="test-loop")
+
+    async def current():
+        return asyncio.get_running_loop(), get_http_clients()
+
+    try:
+        loop_a, clients_a = runner.run(current())
+        loop_b, clients_b = runner.run(current())
+    finally:
+        runner.stop()
+    assert loop_a is loop_b
+    assert clients_a is clients_b
+
+
+def test_loop_runner_overlaps_jobs_submitted_from_worker_threads():
+    runner = LoopRunner(name="test-loop")
+    threads: set[str] = set()
+
+    async def job():
+        threads.add(threading.current_thread().name)
+        await asyncio.sleep(0.2)
+        return True
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: runner.run(job()), range(4)))
+    finally:
+        runner.stop()
+    assert results == [True] * 4
+    assert time.perf_counter() - started < 0.6
+    assert threads == {"test-loop"}
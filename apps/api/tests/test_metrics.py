@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+from prometheus_client import REGISTRY
+
+from tripsmith.core.metrics import JobStageTimer
+from tripsmith.core.metrics import provider_call
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _plan_trip(client) -> str:
+    start = dt.date(2030, 1, 1)
+    payload = {
+        "origin": "SFO",
+        "destination": "PAR",
+        "start_date": start.isoformat(),
+        "end_date": (start + dt.timedelta(days=3)).isoformat(),
+        "budget_total": 1800,
+        "currency": "USD",
+        "travelers": 1,
+    }
+    trip_id = client.post("/api/trips", json=payload, headers={"X-User-Id": "m"}).json()["id"]
+    c = client.post(f"/api/trips/{trip_id}/constraints/generate", headers={"X-User-Id": "m"}).json()
+    client.put(f"/api/trips/{trip_id}/constraints", json={"constraints": c["constraints"]}, headers={"X-User-Id": "m"})
+    assert client.post(f"/api/trips/{trip_id}/plan", headers={"X-User-Id": "m"}).status_code == 200
+    return trip_id
+
+
+def test_metrics_cover_routes_job_stages_providers_and_cache(client):
+    route = {"method": "GET", "route": "/api/trips/{trip_id}", "status": "200"}
+    stage = {"job_type": "plan", "stage": "GENERATE"}
+    flights = {"provider": "MockFlightsProvider", "operation": "search", "outcome": "ok"}
+    before_route = _sample("tripsmith_http_request_duration_seconds_count", **route)
+    before_stage = _sample("tripsmith_job_stage_duration_seconds_count", **stage)
+    before_job = _sample("tripsmith_job_duration_seconds_count", job_type="plan", status="succeeded")
+    before_flights = _sample("tripsmith_provider_call_duration_seconds_count", **flights)
+    before_hits = _sample("tripsmith_provider_cache_requests_total", cache="flights", result="hit")
+    before_misses = _sample("tripsmith_provider_cache_requests_total", cache="flights", result="miss")
+
+    trip_id = _plan_trip(client)
+    assert client.get(f"/api/trips/{trip_id}", headers={"X-User-Id": "m"}).status_code == 200
+
+    assert _sample("tripsmith_http_request_duration_seconds_count", **route) == before_route + 1
+    assert _sample("tripsmith_job_stage_duration_seconds_count", **stage) == before_stage + 1
+    assert _sample("tripsmith_job_duration_seconds_count", job_type="plan", status="succeeded") == before_job + 1
+    # Every miss calls the provider once; a hit from an earlier test's cached search calls it not at all.
+    misses = _sample("tripsmith_provider_cache_requests_total", cache="flights", result="miss") - before_misses
+    hits = _sample("tripsmith_provider_cache_requests_total", cache="flights", result="hit") - before_hits
+    assert misses + hits == 1
+    assert _sample("tripsmith_provider_call_duration_seconds_count", **flights) == before_flights + misses
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert trip_id not in resp.text
+    assert "tripsmith_db_pool_connections" in resp.text
+    assert 'tripsmith_cache_events_total{event="misses"}' in resp.text
+    assert 'tripsmith_log_records_total{outcome="enqueued"}' in resp.text
+
+
+def test_provider_call_records_errors():
+    labels = {"provider": "BrokenProvider", "operation": "search"}
+    with pytest.raises(TimeoutError):
+        with provider_call(**labels):
+            raise TimeoutError
+    assert _sample("tripsmith_provider_call_duration_seconds_count", **labels, outcome="error") == 1
+    assert _sample("tripsmith_provider_call_duration_seconds_count", **labels, outcome="ok") == 0
+
+
+def test_job_stage_timer_closes_the_previous_stage_on_each_transition():
+    timer = JobStageTimer()
+    before = _sample("tripsmith_job_stage_duration_seconds_count", job_type="timer-test", stage="A")
+    timer.enter(job_id="j1", job_type="timer-test", stage="A")
+    timer.enter(job_id="j1", job_type="timer-test", stage="B")
+    assert _sample("tripsmith_job_stage_duration_seconds_count", job_type="timer-test", stage="A") == before + 1
+    timer.finish(job_id="j1", status="failed")
+    timer.finish(job_id="j1", status="failed")
+    assert _sample("tripsmith_job_stage_duration_seconds_count", job_type="timer-test", stage="B") == 1
+    assert _sample("tripsmith_job_duration_seconds_count", job_type="timer-test", status="failed") == 1
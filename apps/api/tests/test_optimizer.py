@@ -1,6 +1,19 @@
 from __future__ import annotations
 
+import dataclasses
+import random
+import time
+
+import numpy as np
+
+from tripsmith.agent.optimizer import _score_comfort
+from tripsmith.agent.optimizer import _score_cost
+from tripsmith.agent.optimizer import _score_time
 from tripsmith.agent.optimizer import choose_plans
+from tripsmith.agent.optimizer import optimize_plans
+from tripsmith.agent.optimizer import pareto_front
+from tripsmith.agent.orchestrator import rank_plans
+from tripsmith.core.config import settings
 from tripsmith.providers.base import FlightCandidate
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import StayCandidate
@@ -51,3 +64,160 @@ def test_optimizer_picks_within_budget_when_possible():
     cheap = out["cheap"]
     assert float(cheap.flight.price_amount) + float(cheap.stay.total_price_amount) <= 800
 
+
+
+def _random_candidates(rng: random.Random, n_flights: int, n_stays: int):
+    flights = [
+        FlightCandidate(
+            id=f"f{i}",
+            depart_at="2030-01-01T10:00:00",
+            arrive_at="2030-01-01T18:00:00",
+            stops=rng.choice([0, 1, 2]),
+            duration_minutes=rng.randint(240, 1000),
+            price_amount=float(rng.randint(100, 900)),
+            currency="USD",
+        )
+        for i in range(n_flights)
+    ]
+    stays = [
+        StayCandidate(
+            id=f"s{i}",
+            name="Stay",
+            area="Center",
+            location=GeoPoint(lat=0.0, lon=0.0),
+            nightly_price_amount=100,
+            total_price_amount=float(rng.randint(200, 2000)),
+            currency="USD",
+        )
+        for i in range(n_stays)
+    ]
+    return flights, stays
+
+
+def test_optimizer_matches_exhaustive_scan():
+    rng = random.Random(7)
+    for _ in range(20):
+        flights, stays = _random_candidates(rng, rng.randint(1, 15), rng.randint(1, 15))
+        budget = float(rng.randint(500, 2500))
+        combos = [(f, s) for f in flights for s in stays]
+
+        def total(c):
+            return float(c[0].price_amount) + float(c[1].total_price_amount)
+
+        def balanced(c):
+            f = c[0]
+            return (
+                (1 - _score_cost(total(c), budget) / 100.0) * 0.45
+                + (1 - _score_time(f.duration_minutes) / 100.0) * 0.35
+                + (1 - _score_comfort(f.stops, 20) / 100.0) * 0.20
+            )
+
+        out = choose_plans(flights=flights, stays=stays, budget_total=budget, daily_commute_minutes_estimate=20)
+        # Each pick heads its objective's ranking, ties broken the same way the alternatives are.
+        assert (out["cheap"].flight, out["cheap"].stay) == min(combos, key=lambda c: (total(c), balanced(c)))
+        assert (out["fast"].flight, out["fast"].stay) == min(combos, key=lambda c: (c[0].duration_minutes, total(c)))
+        assert (out["balanced"].flight, out["balanced"].stay) == min(combos, key=lambda c: (balanced(c), total(c)))
+
+
+def test_fast_pick_takes_the_cheapest_stay_for_the_fastest_flight():
+    flights, stays = _random_candidates(random.Random(1), 1, 3)
+    stays = [dataclasses.replace(s, total_price_amount=price) for s, price in zip(stays, (900.0, 300.0, 500.0))]
+    result = optimize_plans(flights=flights, stays=stays, budget_total=2000, daily_commute_minutes_estimate=20, top_k=2)
+    assert result.picks["fast"].stay.total_price_amount == 300.0
+    assert [c.stay.total_price_amount for c in result.alternatives["fast"]] == [500.0, 900.0]
+
+
+def _trip(*, budget: float) -> dict:
+    return {
+        "origin": "SFO",
+        "destination": "PAR",
+        "start_date": "2030-01-01",
+        "end_date": "2030-01-04",
+        "budget_total": budget,
+        "currency": "USD",
+        "travelers": 1,
+    }
+
+
+def test_over_budget_alternatives_carry_the_budget_warning(monkeypatch):
+    monkeypatch.setattr(settings, "plan_alternatives_per_objective", 2)
+    flights, stays = _random_candidates(random.Random(2), 1, 3)
+    stays = [dataclasses.replace(s, total_price_amount=price) for s, price in zip(stays, (300.0, 900.0, 1500.0))]
+    budget = float(flights[0].price_amount) + 500.0
+    candidates = {
+        "flights": [f.__dict__ for f in flights],
+        "stays": [{**s.__dict__, "location": {"lat": s.location.lat, "lon": s.location.lon}} for s in stays],
+        "daily_commute_minutes_estimate": 20,
+    }
+    plans, _ = rank_plans(trip=_trip(budget=budget), candidates=candidates)
+    assert all(opt.metrics.total_price.amount <= budget and not opt.warnings for opt in plans.options)
+    for alternatives in plans.alternatives.values():
+        for opt in alternatives:
+            assert opt.metrics.total_price.amount > budget
+            assert any(w.startswith("System check: budget") for w in opt.warnings)
+
+
+def test_pareto_front_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(20):
+        objectives = np.array([[rng.randint(0, 6) for _ in range(3)] for _ in range(rng.randint(0, 40))], dtype=np.float64)
+        expected = {
+            i
+            for i, p in enumerate(objectives)
+            if not any(np.all(q <= p) and np.any(q < p) for q in objectives)
+        }
+        assert set(pareto_front(objectives).tolist()) == expected
+
+
+def test_pareto_choices_are_not_dominated_and_reach_plans_json():
+    flights, stays = _random_candidates(random.Random(3), 60, 40)
+    result = optimize_plans(flights=flights, stays=stays, budget_total=1500, daily_commute_minutes_estimate=20, top_k=50)
+    assert result.pareto
+
+    def objectives(f, s):
+        return (float(f.price_amount) + float(s.total_price_amount), f.duration_minutes, -_score_comfort(f.stops, 20))
+
+    everything = [objectives(f, s) for f in flights for s in stays]
+    for choice in result.pareto:
+        p = objectives(choice.flight, choice.stay)
+        assert not any(all(q[k] <= p[k] for k in range(3)) and q != p for q in everything)
+
+    candidates = {
+        "flights": [f.__dict__ for f in flights],
+        "stays": [{**s.__dict__, "location": {"lat": s.location.lat, "lon": s.location.lon}} for s in stays],
+        "daily_commute_minutes_estimate": 20,
+    }
+    plans, _ = rank_plans(trip=_trip(budget=1500.0), candidates=candidates)
+    assert 0 < len(plans.pareto) <= settings.plan_alternatives_per_objective
+    assert [opt.title for opt in plans.pareto][:2] == ["Trade-off option #1", "Trade-off option #2"]
+    front = {(c.flight.depart_at, c.flight.price_amount, c.stay.total_price_amount) for c in result.pareto}
+    assert all((o.flight.depart_at, o.flight.price.amount, o.stay.total_price.amount) in front for o in plans.pareto)
+
+
+def test_optimizer_handles_500_by_500_quickly():
+    flights, stays = _random_candidates(random.Random(11), 500, 500)
+    started = time.perf_counter()
+    result = optimize_plans(flights=flights, stays=stays, budget_total=1800, daily_commute_minutes_estimate=20)
+    # A generous ceiling that still catches a fall back to a per-pair Python loop, which takes seconds.
+    assert time.perf_counter() - started < 2.0
+    assert set(result.picks) == {"cheap", "fast", "balanced"}
+
+
+def test_alternatives_follow_exhaustive_ranking():
+    rng = random.Random(5)
+    flights, stays = _random_candidates(rng, 30, 25)
+    result = optimize_plans(flights=flights, stays=stays, budget_total=1500, daily_commute_minutes_estimate=20, top_k=8)
+    combos = [(f, s) for f in flights for s in stays]
+
+    def cost(c):
+        return float(c[0].price_amount) + float(c[1].total_price_amount)
+
+    cheap = [cost((c.flight, c.stay)) for c in result.alternatives["cheap"]]
+    assert cheap == sorted(cost(c) for c in combos)[1:9]
+    fast = [c.flight.duration_minutes for c in result.alternatives["fast"]]
+    assert fast == sorted(fast)
+    assert fast[0] == min(f.duration_minutes for f in flights)
+    for label, alternatives in result.alternatives.items():
+        assert len(alternatives) == 8
+        pick = result.picks[label]
+        assert all((c.flight, c.stay) != (pick.flight, pick.stay) for c in alternatives)
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import datetime as dt
 
+import fakeredis
+
 from tripsmith.core.config import settings
+from tripsmith.core.rate_limit import RateLimiter
 
 
 def test_rate_limit_returns_429(client):
@@ -35,3 +38,61 @@ def test_rate_limit_returns_429(client):
     finally:
         settings.rate_limit_per_minute = old
 
+
+
+def _fake_redis():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_gcra_spaces_requests_instead_of_resetting_at_window_edge(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 2)
+    monkeypatch.setattr(settings, "rate_limit_per_hour", 0)
+    redis = _fake_redis()
+    limiter = RateLimiter()
+    first = limiter.check(redis, user_id="u", route="plan")
+    second = limiter.check(redis, user_id="u", route="plan")
+    assert (first.allowed, first.remaining) == (True, 1)
+    assert (second.allowed, second.remaining) == (True, 0)
+
+    # A fresh process has no local state; the shared TAT still refuses and reports the next slot.
+    third = RateLimiter().check(redis, user_id="u", route="plan")
+    assert not third.allowed
+    assert 29 <= third.retry_after_seconds <= 30
+    assert RateLimiter().check(redis, user_id="other", route="plan").allowed
+
+
+def test_route_override_and_hourly_rule_are_checked_together(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 1)
+    monkeypatch.setattr(settings, "rate_limit_routes", {"itinerary": 100})
+    monkeypatch.setattr(settings, "rate_limit_per_hour", 3)
+    redis = _fake_redis()
+    results = [RateLimiter().check(redis, user_id="u", route="itinerary") for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, True]
+    minute_tat = redis.get("rl:{u}:itinerary:60")
+    refused = RateLimiter().check(redis, user_id="u", route="itinerary")
+    assert not refused.allowed
+    assert refused.retry_after_seconds > 60
+    # A refusal by one rule must not consume capacity under the others.
+    assert redis.get("rl:{u}:itinerary:60") == minute_tat
+    assert RateLimiter().check(redis, user_id="u", route="plan").allowed
+
+
+def test_local_bucket_sheds_without_touching_redis(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 1)
+    monkeypatch.setattr(settings, "rate_limit_per_hour", 0)
+
+    class _CountingRedis(fakeredis.FakeRedis):
+        calls = 0
+
+        def evalsha(self, *args):
+            _CountingRedis.calls += 1
+            return super().evalsha(*args)
+
+    redis = _CountingRedis(decode_responses=True)
+    limiter = RateLimiter()
+    assert limiter.check(redis, user_id="u", route="plan").allowed
+    before = _CountingRedis.calls
+    refused = limiter.check(redis, user_id="u", route="plan")
+    assert not refused.allowed
+    assert refused.retry_after_seconds >= 59
+    assert _CountingRedis.calls == before
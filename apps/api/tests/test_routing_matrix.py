@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import asyncio
+
+from tripsmith.providers.base import GeoPoint
+from tripsmith.providers.mock_provider import MockRoutingProvider
+from tripsmith.providers.mock_provider import _haversine_minutes
+
+
+def test_mock_matrix_matches_pairwise_estimates():
+    points = [
+        GeoPoint(lat=48.8566, lon=2.3522),
+        GeoPoint(lat=48.8606, lon=2.3376),
+        GeoPoint(lat=48.8530, lon=2.3499),
+        GeoPoint(lat=48.8738, lon=2.2950),
+    ]
+    matrix = asyncio.run(MockRoutingProvider().matrix(points=points, mode="transit"))
+    assert matrix.mode == "estimate"
+    assert len(matrix.minutes) == len(points)
+    for i, a in enumerate(points):
+        for j, b in enumerate(points):
+            assert matrix.minutes[i][j] == _haversine_minutes(a, b, 18.0)
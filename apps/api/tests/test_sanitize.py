@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import random
+import re
+
+from tripsmith.core.sanitize import redact_obj
+from tripsmith.core.sanitize import redact_text
+
+
+_TWO_PASS_EMAIL_RE = re.compile(r"(?i)\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b")
+_TWO_PASS_PHONE_RE = re.compile(r"(?:(?<=\D)|^)(?:\+?\d[\d\s().-]{7,}\d)(?:(?=\D)|$)")
+
+
+def _two_pass(value: str) -> str:
+    return _TWO_PASS_PHONE_RE.sub("[REDACTED_PHONE]", _TWO_PASS_EMAIL_RE.sub("[REDACTED_EMAIL]", value))
+
+
+def test_single_pass_matches_email_then_phone_redaction():
+    pieces = ["1", "23", "456", "7890", " ", "-", ".", "(", ")", "+", "@", "a", "x.co", "_", "%", "\n", "é", "b.org", "9@1.io"]
+    rng = random.Random(24)
+    for _ in range(20000):
+        value = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 24)))
+        assert redact_text(value) == _two_pass(value), value
+
+
+def test_phone_does_not_swallow_the_start_of_an_email():
+    assert redact_text("+1 555 123 45678x@a.com") == "[REDACTED_PHONE] [REDACTED_EMAIL]"
+    assert redact_text("call 555-123-4567 now") == "call [REDACTED_PHONE] now"
+
+
+def test_clean_subtrees_are_returned_without_copying():
+    clean = {"name": "Old Town", "location": {"lat": 50.1, "lon": 14.4}, "tags": ["museum", "park"], "open": "09:00-18:00"}
+    assert redact_obj(clean) is clean
+
+    payload = {"items": [clean, {"contact": "desk@example.org"}], "count": 2}
+    out = redact_obj(payload)
+    assert out is not payload
+    assert out["items"][0] is clean
+    assert out["items"][1] == {"contact": "[REDACTED_EMAIL]"}
+    assert payload["items"][1] == {"contact": "desk@example.org"}
+    assert redact_obj(("a", 1)) == ["a", 1]
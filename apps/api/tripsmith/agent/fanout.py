@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class FanOutCall:
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    timeout_seconds: float
+    required: bool = True
+    after: str | None = None
+
+
+@dataclass
+class FanOutResult:
+    values: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+    timeline: list[dict] = field(default_factory=list)
+    latency_ms: int = 0
+
+
+def _ms(seconds: float) -> int:
+    return int(seconds * 1000)
+
+
+async def fan_out(calls: list[FanOutCall]) -> FanOutResult:
+    names = [c.name for c in calls]
+    if len(set(names)) != len(names):
+        raise ValueError("fan_out call names must be unique")
+    by_name = {c.name: c for c in calls}
+    for c in calls:
+        if c.after is not None and c.after not in by_name:
+            raise ValueError(f"unknown dependency: {c.after}")
+
+    result = FanOutResult()
+    t0 = time.perf_counter()
+    started_at: dict[str, float] = {}
+    pending: dict[asyncio.Future, FanOutCall] = {}
+
+    def start(call: FanOutCall, *args: Any) -> None:
+        started_at[call.name] = time.perf_counter()
+        task = asyncio.ensure_future(asyncio.wait_for(call.fn(*args), timeout=call.timeout_seconds))
+        pending[task] = call
+
+    def skip_dependents(name: str, cause: BaseException) -> None:
+        for dep in calls:
+            if dep.after != name:
+                continue
+            result.errors[dep.name] = cause
+            result.timeline.append({"name": dep.name, "status": "skipped", "after": name})
+            if dep.required:
+                raise cause
+            skip_dependents(dep.name, cause)
+
+    for call in calls:
+        if call.after is None:
+            start(call)
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                call = pending.pop(task)
+                ended = time.perf_counter()
+                entry: dict[str, Any] = {
+                    "name": call.name,
+                    "started_ms": _ms(started_at[call.name] - t0),
+                    "ended_ms": _ms(ended - t0),
+                }
+                if call.after is not None:
+                    entry["after"] = call.after
+                exc = task.exception()
+                if exc is None:
+                    value = task.result()
+                    result.values[call.name] = value
+                    entry["status"] = "ok"
+                    result.timeline.append(entry)
+                    for dep in calls:
+                        if dep.after == call.name:
+                            start(dep, value)
+                    continue
+                result.errors[call.name] = exc
+                entry["status"] = "timeout" if isinstance(exc, asyncio.TimeoutError) else "error"
+                entry["error"] = type(exc).__name__
+                result.timeline.append(entry)
+                if call.required:
+                    raise exc
+                skip_dependents(call.name, exc)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending.keys(), return_exceptions=True)
+
+    result.latency_ms = _ms(time.perf_counter() - t0)
+    return result
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import datetime as dt
 from dataclasses import dataclass
 
+import numpy as np
+
 from tripsmith.providers.base import FlightCandidate
 from tripsmith.providers.base import StayCandidate
 
@@ -30,40 +33,148 @@ def _score_comfort(stops: int, commute_minutes: int) -> float:
     return max(0.0, 100.0 - (stops * 18.0) - (commute_minutes * 0.6))
 
 
-def choose_plans(
+def _is_night(timestamp: str) -> bool:
+    try:
+        hour = dt.datetime.fromisoformat(timestamp.replace("Z", "+00:00")).hour
+    except ValueError:
+        return False
+    return hour >= 22 or hour < 6
+
+
+def filter_flights(flights: list[FlightCandidate], *, constraints: dict | None) -> list[FlightCandidate]:
+    if not constraints:
+        return list(flights)
+    max_transfers = constraints.get("max_transfer_count")
+    night_allowed = bool(constraints.get("night_flight_allowed", True))
+    kept: list[FlightCandidate] = []
+    for f in flights:
+        if max_transfers is not None and int(f.stops) > int(max_transfers):
+            continue
+        if not night_allowed and (_is_night(f.depart_at) or _is_night(f.arrive_at)):
+            continue
+        kept.append(f)
+    return kept
+
+
+def _score_cost_array(total_cost: np.ndarray, budget: float) -> np.ndarray:
+    if budget <= 0:
+        return np.full(total_cost.shape, 50.0)
+    ratio = total_cost / budget
+    under = np.maximum(0.0, 100.0 - (ratio * 60.0))
+    over = np.maximum(0.0, 40.0 - ((ratio - 1) * 60.0))
+    return np.where(ratio <= 1, under, over)
+
+
+def _score_time_array(minutes: np.ndarray) -> np.ndarray:
+    return np.maximum(0.0, 100.0 - (minutes / 12.0))
+
+
+def _score_comfort_array(stops: np.ndarray, commute_minutes: int) -> np.ndarray:
+    return np.maximum(0.0, 100.0 - (stops * 18.0) - (commute_minutes * 0.6))
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    if len(objectives) == 0:
+        return np.arange(0)
+    order = np.lexsort(objectives.T[::-1])
+    points = objectives[order]
+    i = 0
+    while i < len(points):
+        p = points[i]
+        dominated = np.all(p <= points, axis=1) & np.any(p < points, axis=1)
+        keep = ~dominated
+        order = order[keep]
+        points = points[keep]
+        i = int(np.count_nonzero(keep[:i])) + 1
+    return order
+
+
+def top_k_indices(primary: np.ndarray, secondary: np.ndarray, k: int) -> np.ndarray:
+    primary = primary.ravel()
+    secondary = secondary.ravel()
+    if k <= 0 or primary.size == 0:
+        return np.arange(0)
+    if k < primary.size:
+        kth = np.partition(primary, k - 1)[k - 1]
+        candidates = np.flatnonzero(primary <= kth)
+    else:
+        candidates = np.arange(primary.size)
+    order = np.lexsort((candidates, secondary[candidates], primary[candidates]))
+    return candidates[order][:k]
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    picks: dict[str, OptimizedChoice]
+    alternatives: dict[str, list[OptimizedChoice]]
+    # Non-dominated on (cost, flight time, comfort), best balanced first.
+    pareto: list[OptimizedChoice]
+
+
+def optimize_plans(
     *,
     flights: list[FlightCandidate],
     stays: list[StayCandidate],
     budget_total: float,
     daily_commute_minutes_estimate: int,
-) -> dict[str, OptimizedChoice]:
-    flights = flights[:20]
-    stays = stays[:20]
+    top_k: int = 10,
+) -> OptimizationResult:
     if not flights or not stays:
         raise ValueError("Missing candidates")
 
-    combos: list[tuple[float, float, float, FlightCandidate, StayCandidate]] = []
-    for f in flights:
-        for s in stays:
-            cost = float(f.price_amount) + float(s.total_price_amount)
-            time = float(f.duration_minutes)
-            comfort = _score_comfort(f.stops, daily_commute_minutes_estimate)
-            combos.append((cost, time, comfort, f, s))
-
-    cheapest = min(combos, key=lambda x: x[0])
-    fastest = min(combos, key=lambda x: x[1])
-
-    def balanced_key(x: tuple[float, float, float, FlightCandidate, StayCandidate]) -> float:
-        cost, time, _comfort, _f, _s = x
-        return (1 - (_score_cost(cost, budget_total) / 100.0)) * 0.45 + (1 - (_score_time(int(time)) / 100.0)) * 0.35 + (1 - (_comfort / 100.0)) * 0.20
+    flight_price = np.fromiter((float(f.price_amount) for f in flights), dtype=np.float64, count=len(flights))
+    flight_minutes = np.fromiter((float(f.duration_minutes) for f in flights), dtype=np.float64, count=len(flights))
+    flight_stops = np.fromiter((int(f.stops) for f in flights), dtype=np.float64, count=len(flights))
+    stay_price = np.fromiter((float(s.total_price_amount) for s in stays), dtype=np.float64, count=len(stays))
+
+    cost = flight_price[:, None] + stay_price[None, :]
+    comfort = _score_comfort_array(flight_stops, daily_commute_minutes_estimate)
+    balanced_key = (
+        (1 - (_score_cost_array(cost, budget_total) / 100.0)) * 0.45
+        + ((1 - (_score_time_array(flight_minutes) / 100.0)) * 0.35)[:, None]
+        + ((1 - (comfort / 100.0)) * 0.20)[:, None]
+    )
+    n_stays = len(stays)
+
+    def choice(flat_index: int) -> OptimizedChoice:
+        fi, si = divmod(int(flat_index), n_stays)
+        return OptimizedChoice(flights[fi], stays[si], daily_commute_minutes_estimate)
+
+    ranking_keys = {
+        "cheap": (cost, balanced_key),
+        "fast": (np.broadcast_to(flight_minutes[:, None], cost.shape), cost),
+        "balanced": (balanced_key, cost),
+    }
+    # The pick is the head of the same ranking as its alternatives, so "#2" can never beat "#1".
+    picks: dict[str, OptimizedChoice] = {}
+    alternatives: dict[str, list[OptimizedChoice]] = {}
+    for label, (primary, secondary) in ranking_keys.items():
+        top = top_k_indices(primary, secondary, top_k + 1)
+        picks[label] = choice(top[0])
+        alternatives[label] = [choice(i) for i in top[1:]]
+
+    # Stays only move the cost objective, so each flight's only Pareto-optimal
+    # pairing is its cheapest stay; the front is computed over those pairs.
+    cheapest_stay = int(np.argmin(stay_price))
+    per_flight = np.stack([flight_price + stay_price[cheapest_stay], flight_minutes, -comfort], axis=1)
+    front_flat = pareto_front(per_flight) * n_stays + cheapest_stay
+    ranked = front_flat[np.argsort(balanced_key.ravel()[front_flat], kind="stable")][:top_k]
+    return OptimizationResult(picks=picks, alternatives=alternatives, pareto=[choice(i) for i in ranked])
 
-    balanced = min(combos, key=balanced_key)
 
-    return {
-        "cheap": OptimizedChoice(cheapest[3], cheapest[4], daily_commute_minutes_estimate),
-        "fast": OptimizedChoice(fastest[3], fastest[4], daily_commute_minutes_estimate),
-        "balanced": OptimizedChoice(balanced[3], balanced[4], daily_commute_minutes_estimate),
-    }
+def choose_plans(
+    *,
+    flights: list[FlightCandidate],
+    stays: list[StayCandidate],
+    budget_total: float,
+    daily_commute_minutes_estimate: int,
+) -> dict[str, OptimizedChoice]:
+    return optimize_plans(
+        flights=flights,
+        stays=stays,
+        budget_total=budget_total,
+        daily_commute_minutes_estimate=daily_commute_minutes_estimate,
+    ).picks
 
 
 def compute_scorecard(
@@ -5,16 +5,26 @@ import hashlib
 import json
 import time
 
-from redis import Redis
-
-from tripsmith.agent.optimizer import choose_plans
+from tripsmith.agent.fanout import FanOutCall
+from tripsmith.agent.fanout import FanOutResult
+from tripsmith.agent.fanout import fan_out
+from tripsmith.agent.optimizer import OptimizedChoice
 from tripsmith.agent.optimizer import compute_scorecard
+from tripsmith.agent.optimizer import filter_flights
+from tripsmith.agent.optimizer import optimize_plans
 from tripsmith.agent.verifier import trip_days
 from tripsmith.agent.verifier import verify_itinerary
 from tripsmith.agent.verifier import verify_plans
+from tripsmith.core.cache import ProviderCache
+from tripsmith.core.config import settings
+from tripsmith.core.metrics import provider_cache_requests
+from tripsmith.core.metrics import provider_call
 from tripsmith.core.sanitize import redact_obj
+from tripsmith.providers.base import FlightCandidate
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import PoiCandidate
+from tripsmith.providers.base import StayCandidate
+from tripsmith.providers.mock_provider import MockRoutingProvider
 from tripsmith.providers.registry import get_flights_provider
 from tripsmith.providers.registry import get_poi_provider
 from tripsmith.providers.registry import get_routing_provider
@@ -34,19 +44,31 @@ from tripsmith.schemas.plan import PlanScores
 from tripsmith.schemas.plan import StaySummary
 
 
+_FETCH_DEADLINE_SECONDS = 20.0
+_ROUTING_DEADLINE_SECONDS = 8.0
+_DEFAULT_DAILY_COMMUTE_MINUTES = 30
+_PLAN_LABELS = ("cheap", "fast", "balanced")
+
+
 def _cache_key(prefix: str, payload: dict) -> str:
     raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
     h = hashlib.sha256(raw.encode("utf-8")).hexdigest()
     return f"cache:{prefix}:{h}"
 
 
-async def _cached(redis: Redis, *, key: str, ttl_seconds: int, fn):
-    hit = redis.get(key)
-    if hit is not None:
-        return json.loads(hit)
-    value = await fn()
-    redis.setex(key, ttl_seconds, json.dumps(value))
-    return value
+async def _cached(cache: ProviderCache, *, key: str, ttl_seconds: int, fn):
+    fetched = False
+
+    async def fetch():
+        nonlocal fetched
+        fetched = True
+        return await fn()
+
+    try:
+        return await cache.get_or_fetch(key=key, ttl_seconds=ttl_seconds, fn=fetch)
+    finally:
+        # Waiting on another caller's in-flight fetch counts as a hit: this call never reached the provider.
+        provider_cache_requests.labels(key.split(":", 2)[1], "miss" if fetched else "hit").inc()
 
 
 def _to_geo(stay_location: GeoPoint) -> GeoPoint:
@@ -57,7 +79,7 @@ def _center_from_stay(stay_location: GeoPoint) -> GeoPoint:
     return GeoPoint(lat=float(stay_location.lat), lon=float(stay_location.lon))
 
 
-async def generate_plans(*, redis: Redis, trip: dict) -> tuple[PlansJson, str, list[dict]]:
+async def generate_plans(*, cache: ProviderCache, trip: dict) -> tuple[PlansJson, str, list[dict], dict]:
     flights_provider = get_flights_provider()
     stays_provider = get_stays_provider()
     routing_provider = get_routing_provider()
@@ -73,6 +95,16 @@ async def generate_plans(*, redis: Redis, trip: dict) -> tuple[PlansJson, str, l
             }
         )
 
+    def record_fan_out(tool: str, fetched: FanOutResult):
+        tool_calls.append(
+            {
+                "tool": tool,
+                "input": {},
+                "output": {"timeline": fetched.timeline},
+                "latency_ms": fetched.latency_ms,
+            }
+        )
+
     start_date = trip["start_date"].isoformat() if isinstance(trip["start_date"], dt.date) else str(trip["start_date"])
     end_date = trip["end_date"].isoformat() if isinstance(trip["end_date"], dt.date) else str(trip["end_date"])
 
@@ -93,14 +125,16 @@ async def generate_plans(*, redis: Redis, trip: dict) -> tuple[PlansJson, str, l
 
     async def fetch_flights():
         started = time.perf_counter()
-        results = await flights_provider.search(**flights_payload)
+        with provider_call(type(flights_provider).__name__, "search"):
+            results = await flights_provider.search(**flights_payload)
         out = [r.__dict__ for r in results]
         record(type(flights_provider).__name__ + ".search", flights_payload, {"count": len(out), "items": out[:3]}, started=started)
         return out
 
     async def fetch_stays():
         started = time.perf_counter()
-        results = await stays_provider.search(**stays_payload)
+        with provider_call(type(stays_provider).__name__, "search"):
+            results = await stays_provider.search(**stays_payload)
         out = [
             {
                 **r.__dict__,
@@ -111,114 +145,88 @@ async def generate_plans(*, redis: Redis, trip: dict) -> tuple[PlansJson, str, l
         record(type(stays_provider).__name__ + ".search", stays_payload, {"count": len(out), "items": out[:3]}, started=started)
         return out
 
-    flights_raw = await _cached(redis, key=_cache_key("flights", flights_payload), ttl_seconds=60 * 30, fn=fetch_flights)
-    stays_raw = await _cached(redis, key=_cache_key("stays", stays_payload), ttl_seconds=60 * 30, fn=fetch_stays)
-
-    from tripsmith.providers.base import FlightCandidate
-    from tripsmith.providers.base import StayCandidate
-
-    flights = [FlightCandidate(**f) for f in flights_raw][:20]
-    stays = [StayCandidate(**{**s, "location": GeoPoint(**s["location"])}) for s in stays_raw][:20]
-
-    started = time.perf_counter()
-    commute_est = await routing_provider.estimate(from_point=_to_geo(stays[0].location), to_point=_to_geo(stays[1].location), mode="transit")
-    record(
-        type(routing_provider).__name__ + ".estimate",
-        {"from": {"lat": stays[0].location.lat, "lon": stays[0].location.lon}, "to": {"lat": stays[1].location.lat, "lon": stays[1].location.lon}, "mode": "transit"},
-        commute_est.__dict__,
-        started=started,
+    async def estimate_commute(stays_raw: list[dict]):
+        a = stays_raw[0]["location"]
+        b = stays_raw[1 if len(stays_raw) > 1 else 0]["location"]
+        started = time.perf_counter()
+        with provider_call(type(routing_provider).__name__, "estimate"):
+            est = await routing_provider.estimate(from_point=GeoPoint(**a), to_point=GeoPoint(**b), mode="transit")
+        record(type(routing_provider).__name__ + ".estimate", {"from": a, "to": b, "mode": "transit"}, est.__dict__, started=started)
+        return est
+
+    fetched = await fan_out(
+        [
+            FanOutCall(
+                "flights",
+                lambda: _cached(cache, key=_cache_key("flights", flights_payload), ttl_seconds=60 * 30, fn=fetch_flights),
+                timeout_seconds=_FETCH_DEADLINE_SECONDS,
+            ),
+            FanOutCall(
+                "stays",
+                lambda: _cached(cache, key=_cache_key("stays", stays_payload), ttl_seconds=60 * 30, fn=fetch_stays),
+                timeout_seconds=_FETCH_DEADLINE_SECONDS,
+            ),
+            FanOutCall("commute", estimate_commute, timeout_seconds=_ROUTING_DEADLINE_SECONDS, required=False, after="stays"),
+        ]
     )
-    daily_commute_est = int(commute_est.minutes)
-
-    chosen = choose_plans(flights=flights, stays=stays, budget_total=float(trip["budget_total"]), daily_commute_minutes_estimate=daily_commute_est)
-    options: list[PlanOption] = []
-    for label in ("cheap", "fast", "balanced"):
-        c = chosen[label]
-        total_cost = float(c.flight.price_amount) + float(c.stay.total_price_amount)
-        scorecard = compute_scorecard(
-            total_cost=total_cost,
-            currency=str(c.stay.currency),
-            budget_total=float(trip["budget_total"]),
-            flight_minutes=int(c.flight.duration_minutes),
-            stops=int(c.flight.stops),
-            commute_minutes=int(c.daily_commute_minutes_estimate),
-        )
-        cost_score = float(scorecard["cost_score"])
-        time_score = float(scorecard["time_score"])
-        comfort_score = float(scorecard["comfort_score"])
-        commute_score = float(scorecard["commute_score"])
-        daily_load_score = float(scorecard["daily_load_score"])
-        warnings: list[str] = []
-        if total_cost > float(trip["budget_total"]):
-            warnings.append("Budget may be insufficient; this option exceeds your budget")
-        if c.flight.stops >= 2:
-            warnings.append("Many transfers; watch visas and baggage connections")
-        rationale_md = (
-            f"- Cost score: {cost_score:.0f}/100 (budget {float(trip['budget_total']):.0f})\n"
-            f"- Time score: {time_score:.0f}/100 (flight {int(c.flight.duration_minutes)} min)\n"
-            f"- Comfort score: {comfort_score:.0f}/100 (transfers {int(c.flight.stops)})\n"
-            f"- Commute score: {commute_score:.0f}/100 (daily commute est. {int(c.daily_commute_minutes_estimate)} min)\n"
-            f"- Daily load score: {daily_load_score:.0f}/100\n"
-        )
-        options.append(
-            PlanOption(
-                label=label,
-                title={"cheap": "Budget option", "fast": "Time-saver option", "balanced": "Balanced option"}[label],
-                flight=FlightSummary(
-                    depart_at=c.flight.depart_at,
-                    arrive_at=c.flight.arrive_at,
-                    stops=int(c.flight.stops),
-                    duration_minutes=int(c.flight.duration_minutes),
-                    price=Money(amount=float(c.flight.price_amount), currency=str(c.flight.currency)),
-                ),
-                stay=StaySummary(
-                    name=c.stay.name,
-                    area=c.stay.area,
-                    nightly_price=Money(amount=float(c.stay.nightly_price_amount), currency=str(c.stay.currency)),
-                    total_price=Money(amount=float(c.stay.total_price_amount), currency=str(c.stay.currency)),
-                ),
-                metrics=PlanMetrics(
-                    total_price=Money(amount=float(total_cost), currency=str(c.stay.currency)),
-                    total_flight_minutes=int(c.flight.duration_minutes),
-                    transfer_count=int(c.flight.stops),
-                    daily_commute_minutes_estimate=int(c.daily_commute_minutes_estimate),
-                ),
-                scorecard=PlanScorecard(
-                    total_cost=float(scorecard["total_cost"]),
-                    currency=str(scorecard["currency"]),
-                    total_travel_time_hours=float(scorecard["total_travel_time_hours"]),
-                    num_transfers=int(scorecard["num_transfers"]),
-                    daily_load_score=daily_load_score,
-                    commute_score=commute_score,
-                    comfort_score=comfort_score,
-                    cost_score=cost_score,
-                    time_score=time_score,
-                    rationale_md=rationale_md,
-                ),
-                scores=PlanScores(
-                    daily_load_score=daily_load_score,
-                    commute_score=commute_score,
-                    comfort_score=comfort_score,
-                    cost_score=cost_score,
-                    time_score=time_score,
-                ),
-                explanation=_explain(label, cost_score, time_score, comfort_score, warnings),
-                warnings=warnings,
-            )
-        )
-
-    plans = PlansJson(generated_at=dt.datetime.now(dt.timezone.utc), options=options)
-    issues = verify_plans(trip_budget=float(trip["budget_total"]), plans=plans)
+    record_fan_out("fan_out.candidates", fetched)
+    flights_raw = fetched.values["flights"]
+    stays_raw = fetched.values["stays"]
+
+    commute_est = fetched.values.get("commute")
+    candidates = {
+        "flights": flights_raw,
+        "stays": stays_raw,
+        "daily_commute_minutes_estimate": int(commute_est.minutes) if commute_est is not None else _DEFAULT_DAILY_COMMUTE_MINUTES,
+    }
+    plans, explain_md = rank_plans(trip=trip, candidates=candidates)
+    return plans, explain_md, tool_calls, candidates
+
+
+def rank_plans(*, trip: dict, candidates: dict) -> tuple[PlansJson, str]:
+    all_flights = [FlightCandidate(**f) for f in candidates["flights"]]
+    stays = [StayCandidate(**{**s, "location": GeoPoint(**s["location"])}) for s in candidates["stays"]]
+    daily_commute_est = int(candidates["daily_commute_minutes_estimate"])
+    budget_total = float(trip["budget_total"])
+
+    flights = filter_flights(all_flights, constraints=trip.get("constraints"))
+    constraints_relaxed = not flights
+    if constraints_relaxed:
+        flights = all_flights
+
+    optimized = optimize_plans(
+        flights=flights,
+        stays=stays,
+        budget_total=budget_total,
+        daily_commute_minutes_estimate=daily_commute_est,
+        top_k=settings.plan_alternatives_per_objective,
+    )
+    options = [_plan_option(label, optimized.picks[label], budget_total=budget_total) for label in _PLAN_LABELS]
+    alternatives = {
+        label: [_plan_option(label, c, budget_total=budget_total, rank=rank) for rank, c in enumerate(optimized.alternatives[label], start=2)]
+        for label in _PLAN_LABELS
+    }
+    # Trade-offs no other candidate beats on cost, flight time and comfort at once; listed as balanced options.
+    pareto = [
+        _plan_option("balanced", c, budget_total=budget_total, title=f"Trade-off option #{rank}")
+        for rank, c in enumerate(optimized.pareto, start=1)
+    ]
+    plans = PlansJson(generated_at=dt.datetime.now(dt.timezone.utc), options=options, alternatives=alternatives, pareto=pareto)
+    if constraints_relaxed:
+        for opt in _all_options(plans):
+            opt.warnings.append("No flight meets your transfer or night-flight constraints; showing the closest options")
+
+    issues = verify_plans(trip_budget=budget_total, plans=plans)
     if issues:
-        for opt in plans.options:
-            if opt.metrics.total_price.amount > float(trip["budget_total"]):
+        for opt in _all_options(plans):
+            if opt.metrics.total_price.amount > budget_total:
                 opt.warnings.append("System check: budget constraint cannot be satisfied; returning the closest option")
 
     explain_md = render_plans_markdown(trip=trip, plans=plans)
-    return plans, explain_md, tool_calls
+    return plans, explain_md
 
 
-async def generate_itinerary(*, redis: Redis, trip: dict, plan: PlansJson, plan_index: int) -> tuple[ItineraryJson, str, list[dict]]:
+async def generate_itinerary(*, cache: ProviderCache, trip: dict, plan: PlansJson, plan_index: int) -> tuple[ItineraryJson, str, list[dict]]:
     poi_provider = get_poi_provider()
     weather_provider = get_weather_provider()
     routing_provider = get_routing_provider()
@@ -236,6 +244,16 @@ async def generate_itinerary(*, redis: Redis, trip: dict, plan: PlansJson, plan_
             }
         )
 
+    def record_fan_out(tool: str, fetched: FanOutResult):
+        tool_calls.append(
+            {
+                "tool": tool,
+                "input": {},
+                "output": {"timeline": fetched.timeline},
+                "latency_ms": fetched.latency_ms,
+            }
+        )
+
     center = GeoPoint(lat=48.8566, lon=2.3522)
     if plan.options and plan.options[0].stay and "location" in trip.get("preferences", {}):
         loc = trip["preferences"]["location"]
@@ -246,55 +264,88 @@ async def generate_itinerary(*, redis: Redis, trip: dict, plan: PlansJson, plan_
 
     async def fetch_poi():
         started = time.perf_counter()
-        pois = await poi_provider.search(destination=trip["destination"], center=center, limit=50)
+        with provider_call(type(poi_provider).__name__, "search"):
+            pois = await poi_provider.search(destination=trip["destination"], center=center, limit=50)
         out = [{"id": p.id, "name": p.name, "location": {"lat": p.location.lat, "lon": p.location.lon}} for p in pois]
         record(type(poi_provider).__name__ + ".search", poi_payload, {"count": len(out), "items": out[:3]}, started=started)
         return out
 
-    poi_raw = await _cached(redis, key=_cache_key("poi", poi_payload), ttl_seconds=60 * 60, fn=fetch_poi)
-    pois: list[PoiCandidate] = [PoiCandidate(id=p["id"], name=p["name"], location=GeoPoint(**p["location"])) for p in poi_raw]
-
     start_date = trip["start_date"].isoformat() if isinstance(trip["start_date"], dt.date) else str(trip["start_date"])
     end_date = trip["end_date"].isoformat() if isinstance(trip["end_date"], dt.date) else str(trip["end_date"])
-    started = time.perf_counter()
-    weather = await weather_provider.forecast(center=center, start_date=start_date, end_date=end_date)
-    record(
-        type(weather_provider).__name__ + ".forecast",
-        {"center": {"lat": center.lat, "lon": center.lon}, "start_date": start_date, "end_date": end_date},
-        {"count": len(weather), "items": [w.__dict__ for w in weather[:3]]},
-        started=started,
-    )
-    weather_map = {w.date: w.summary for w in weather}
-
     dates = trip_days(dt.date.fromisoformat(start_date), dt.date.fromisoformat(end_date))
     periods = ["morning", "afternoon", "evening"]
+    stops_needed = len(dates) * len(periods)
+
+    async def fetch_weather():
+        started = time.perf_counter()
+        with provider_call(type(weather_provider).__name__, "forecast"):
+            weather = await weather_provider.forecast(center=center, start_date=start_date, end_date=end_date)
+        record(
+            type(weather_provider).__name__ + ".forecast",
+            {"center": {"lat": center.lat, "lon": center.lon}, "start_date": start_date, "end_date": end_date},
+            {"count": len(weather), "items": [w.__dict__ for w in weather[:3]]},
+            started=started,
+        )
+        return weather
+
+    async def fetch_matrix(poi_raw: list[dict]):
+        points = [center] + [GeoPoint(**p["location"]) for p in poi_raw[:stops_needed]]
+        started = time.perf_counter()
+        with provider_call(type(routing_provider).__name__, "matrix"):
+            matrix = await routing_provider.matrix(points=points, mode="transit")
+        record(
+            type(routing_provider).__name__ + ".matrix",
+            {"points": [{"lat": p.lat, "lon": p.lon} for p in points[:3]], "count": len(points), "mode": "transit"},
+            {"mode": matrix.mode, "size": len(matrix.minutes)},
+            started=started,
+        )
+        return matrix
+
+    fetched = await fan_out(
+        [
+            FanOutCall(
+                "poi",
+                lambda: _cached(cache, key=_cache_key("poi", poi_payload), ttl_seconds=60 * 60, fn=fetch_poi),
+                timeout_seconds=_FETCH_DEADLINE_SECONDS,
+            ),
+            FanOutCall("weather", fetch_weather, timeout_seconds=_FETCH_DEADLINE_SECONDS, required=False),
+            FanOutCall("matrix", fetch_matrix, timeout_seconds=_ROUTING_DEADLINE_SECONDS, required=False, after="poi"),
+        ]
+    )
+    record_fan_out("fan_out.itinerary", fetched)
+    poi_raw = fetched.values["poi"]
+    pois: list[PoiCandidate] = [PoiCandidate(id=p["id"], name=p["name"], location=GeoPoint(**p["location"])) for p in poi_raw]
+    weather_map = {w.date: w.summary for w in fetched.values.get("weather") or []}
+    matrix = fetched.values.get("matrix")
+    if matrix is None:
+        points = [center] + [p.location for p in pois[:stops_needed]]
+        matrix = await MockRoutingProvider().matrix(points=points, mode="transit")
+    commute_mode = "transit" if matrix.mode != "estimate" else "estimate"
+
     per_day = []
     idx = 0
-    last_point = center
+    last_node = 0
 
     for d in dates:
         items: list[ItineraryItem] = []
         weather_summary = weather_map.get(d.isoformat(), "Forecast unavailable")
         for period in periods:
-            poi = pois[idx % max(1, len(pois))] if pois else PoiCandidate(id="poi", name="Free exploration", location=center)
-            started = time.perf_counter()
-            est = await routing_provider.estimate(from_point=last_point, to_point=poi.location, mode="transit")
-            record(
-                type(routing_provider).__name__ + ".estimate",
-                {"from": {"lat": last_point.lat, "lon": last_point.lon}, "to": {"lat": poi.location.lat, "lon": poi.location.lon}, "mode": "transit"},
-                est.__dict__,
-                started=started,
-            )
+            if pois:
+                poi = pois[idx % len(pois)]
+                node = 1 + idx % len(pois)
+            else:
+                poi = PoiCandidate(id="poi", name="Free exploration", location=center)
+                node = 0
             items.append(
                 ItineraryItem(
                     period=period,
                     poi_name=poi.name,
                     stay_minutes=90 if period != "evening" else 120,
-                    commute=Commute(mode="transit" if est.mode != "estimate" else "estimate", minutes=int(est.minutes)),
+                    commute=Commute(mode=commute_mode, minutes=int(matrix.minutes[last_node][node])),
                     weather_summary=weather_summary,
                 )
             )
-            last_point = poi.location
+            last_node = node
             idx += 1
         per_day.append(ItineraryDay(date=d, items=items))
 
@@ -312,6 +363,87 @@ async def generate_itinerary(*, redis: Redis, trip: dict, plan: PlansJson, plan_
     return itinerary, md, tool_calls
 
 
+def _all_options(plans: PlansJson) -> list[PlanOption]:
+    return [*plans.options, *(a for alts in plans.alternatives.values() for a in alts), *plans.pareto]
+
+
+def _plan_option(label: str, c: OptimizedChoice, *, budget_total: float, rank: int = 1, title: str | None = None) -> PlanOption:
+    if title is None:
+        title = {"cheap": "Budget option", "fast": "Time-saver option", "balanced": "Balanced option"}[label]
+        if rank > 1:
+            title = f"{title} #{rank}"
+    total_cost = float(c.flight.price_amount) + float(c.stay.total_price_amount)
+    scorecard = compute_scorecard(
+        total_cost=total_cost,
+        currency=str(c.stay.currency),
+        budget_total=budget_total,
+        flight_minutes=int(c.flight.duration_minutes),
+        stops=int(c.flight.stops),
+        commute_minutes=int(c.daily_commute_minutes_estimate),
+    )
+    cost_score = float(scorecard["cost_score"])
+    time_score = float(scorecard["time_score"])
+    comfort_score = float(scorecard["comfort_score"])
+    commute_score = float(scorecard["commute_score"])
+    daily_load_score = float(scorecard["daily_load_score"])
+    warnings: list[str] = []
+    if total_cost > budget_total:
+        warnings.append("Budget may be insufficient; this option exceeds your budget")
+    if c.flight.stops >= 2:
+        warnings.append("Many transfers; watch visas and baggage connections")
+    rationale_md = (
+        f"- Cost score: {cost_score:.0f}/100 (budget {budget_total:.0f})\n"
+        f"- Time score: {time_score:.0f}/100 (flight {int(c.flight.duration_minutes)} min)\n"
+        f"- Comfort score: {comfort_score:.0f}/100 (transfers {int(c.flight.stops)})\n"
+        f"- Commute score: {commute_score:.0f}/100 (daily commute est. {int(c.daily_commute_minutes_estimate)} min)\n"
+        f"- Daily load score: {daily_load_score:.0f}/100\n"
+    )
+    return PlanOption(
+        label=label,
+        title=title,
+        flight=FlightSummary(
+            depart_at=c.flight.depart_at,
+            arrive_at=c.flight.arrive_at,
+            stops=int(c.flight.stops),
+            duration_minutes=int(c.flight.duration_minutes),
+            price=Money(amount=float(c.flight.price_amount), currency=str(c.flight.currency)),
+        ),
+        stay=StaySummary(
+            name=c.stay.name,
+            area=c.stay.area,
+            nightly_price=Money(amount=float(c.stay.nightly_price_amount), currency=str(c.stay.currency)),
+            total_price=Money(amount=float(c.stay.total_price_amount), currency=str(c.stay.currency)),
+        ),
+        metrics=PlanMetrics(
+            total_price=Money(amount=float(total_cost), currency=str(c.stay.currency)),
+            total_flight_minutes=int(c.flight.duration_minutes),
+            transfer_count=int(c.flight.stops),
+            daily_commute_minutes_estimate=int(c.daily_commute_minutes_estimate),
+        ),
+        scorecard=PlanScorecard(
+            total_cost=float(scorecard["total_cost"]),
+            currency=str(scorecard["currency"]),
+            total_travel_time_hours=float(scorecard["total_travel_time_hours"]),
+            num_transfers=int(scorecard["num_transfers"]),
+            daily_load_score=daily_load_score,
+            commute_score=commute_score,
+            comfort_score=comfort_score,
+            cost_score=cost_score,
+            time_score=time_score,
+            rationale_md=rationale_md,
+        ),
+        scores=PlanScores(
+            daily_load_score=daily_load_score,
+            commute_score=commute_score,
+            comfort_score=comfort_score,
+            cost_score=cost_score,
+            time_score=time_score,
+        ),
+        explanation=_explain(label, cost_score, time_score, comfort_score, warnings),
+        warnings=warnings,
+    )
+
+
 def _explain(label: str, cost_score: float, time_score: float, comfort_score: float, warnings: list[str]) -> str:
     tag = {"cheap": "More budget-focused", "fast": "More time-focused", "balanced": "More balanced"}[label]
     core = f"{tag}. Scores: cost {cost_score:.0f}/100, time {time_score:.0f}/100, comfort {comfort_score:.0f}/100."
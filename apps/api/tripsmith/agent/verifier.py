@@ -11,6 +11,13 @@ def verify_plans(*, trip_budget: float, plans: PlansJson) -> list[str]:
     for opt in plans.options:
         if opt.metrics.total_price.amount > trip_budget:
             issues.append(f"{opt.label}: over budget")
+    for label, alternatives in plans.alternatives.items():
+        for rank, opt in enumerate(alternatives, start=2):
+            if opt.metrics.total_price.amount > trip_budget:
+                issues.append(f"{label} #{rank}: over budget")
+    for rank, opt in enumerate(plans.pareto, start=1):
+        if opt.metrics.total_price.amount > trip_budget:
+            issues.append(f"trade-off #{rank}: over budget")
     return issues
 
 
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+import httpx
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from tripsmith.core.config import settings
+from tripsmith.core.ids import new_id
+
+
+_MISSING = object()
+_LOCK_TTL_SECONDS = 25.0
+_LOCK_WAIT_SECONDS = 10.0
+_INVALIDATE_CHANNEL = "cache:invalidate"
+_URL_QUERY_RE = re.compile(r"(https?://[^\s?#'\"]+)[?#][^\s'\"]*")
+
+
+class CachedProviderError(RuntimeError):
+    pass
+
+
+def _cacheable_error(e: Exception) -> str:
+    # Negative entries live in shared Redis and are replayed to every caller, and providers such as
+    # OpenTripMap pass their API key as a query parameter, so never keep a request URL's query string.
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"{type(e).__name__}: HTTP {e.response.status_code}"
+    return _URL_QUERY_RE.sub(r"\1", f"{type(e).__name__}: {e}")[:256]
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    local_evictions: int = 0
+    invalidations: int = 0
+    hits: int = 0
+    misses: int = 0
+    early_refreshes: int = 0
+    negative_hits: int = 0
+    lock_waits: int = 0
+    fetches: int = 0
+    fetch_errors: int = 0
+    redis_errors: int = 0
+    read_ms_total: float = 0.0
+    fetch_ms_total: float = 0.0
+
+    def snapshot(self) -> dict[str, int | float]:
+        return asdict(self)
+
+
+cache_stats = CacheStats()
+
+
+# Values are handed out by reference to every caller; treat them as read-only.
+class LocalCache:
+    def __init__(self, *, max_entries: int, max_bytes: int, stats: CacheStats = cache_stats):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, size, value = item
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, *, size: int, expires_at: float) -> None:
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _key, (_exp, evicted_size, _value) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.local_evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+local_cache = LocalCache(max_entries=settings.cache_local_max_entries, max_bytes=settings.cache_local_max_bytes)
+
+
+class ProviderCache:
+    def __init__(
+        self,
+        redis: AsyncRedis,
+        *,
+        beta: float | None = None,
+        negative_ttl_seconds: int | None = None,
+        local: LocalCache | None = local_cache,
+        stats: CacheStats = cache_stats,
+    ):
+        self.redis = redis
+        self.local = local
+        self.origin = new_id()
+        self.beta = settings.cache_xfetch_beta if beta is None else beta
+        self.negative_ttl_seconds = settings.cache_negative_ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+        self.stats = stats
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def get_or_fetch(self, *, key: str, ttl_seconds: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not _MISSING:
+                self.stats.local_hits += 1
+                return value
+        entry = await self._read(key)
+        if entry is None:
+            self.stats.misses += 1
+            return await self._single_flight(key, ttl_seconds, fn, stale=_MISSING)
+        if "err" in entry:
+            self.stats.negative_hits += 1
+            raise CachedProviderError(str(entry["err"]))
+        if not self._should_refresh_early(entry):
+            self.stats.hits += 1
+            self._remember(key, entry)
+            return entry["v"]
+        self.stats.early_refreshes += 1
+        return await self._single_flight(key, ttl_seconds, fn, stale=entry["v"])
+
+    def _should_refresh_early(self, entry: dict) -> bool:
+        delta = float(entry.get("delta") or 0.0)
+        expires_at = float(entry.get("exp") or 0.0)
+        if delta <= 0 or self.beta <= 0:
+            return False
+        return time.time() - delta * self.beta * math.log(1.0 - random.random()) >= expires_at
+
+    async def _single_flight(self, key: str, ttl_seconds: int, fn, *, stale: Any) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            if stale is not _MISSING:
+                return stale
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._locked_refresh(key, ttl_seconds, fn, stale=stale))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _locked_refresh(self, key: str, ttl_seconds: int, fn, *, stale: Any) -> Any:
+        lock_key = f"lock:{key}"
+        token = new_id()
+        try:
+            acquired = bool(await self.redis.set(lock_key, token, nx=True, px=int(_LOCK_TTL_SECONDS * 1000)))
+        except RedisError:
+            self.stats.redis_errors += 1
+            acquired = False
+            lock_key = ""
+        if not acquired and lock_key:
+            if stale is not _MISSING:
+                return stale
+            entry = await self._wait_for_holder(key, lock_key)
+            if entry is not None:
+                if "err" in entry:
+                    self.stats.negative_hits += 1
+                    raise CachedProviderError(str(entry["err"]))
+                return entry["v"]
+        try:
+            return await self._fetch_and_store(key, ttl_seconds, fn, stale=stale)
+        finally:
+            if acquired:
+                await self._release(lock_key, token)
+
+    async def _wait_for_holder(self, key: str, lock_key: str) -> dict | None:
+        self.stats.lock_waits += 1
+        deadline = time.monotonic() + _LOCK_WAIT_SECONDS
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            entry = await self._read(key)
+            if entry is not None:
+                return entry
+            try:
+                if not await self.redis.exists(lock_key):
+                    return None
+            except RedisError:
+                self.stats.redis_errors += 1
+                return None
+        return None
+
+    async def _fetch_and_store(self, key: str, ttl_seconds: int, fn, *, stale: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            value = await fn()
+        except Exception as e:
+            self.stats.fetch_errors += 1
+            if stale is not _MISSING:
+                return stale
+            await self._write(key, {"err": _cacheable_error(e)}, self.negative_ttl_seconds)
+            raise
+        delta = time.perf_counter() - started
+        self.stats.fetches += 1
+        self.stats.fetch_ms_total += delta * 1000
+        entry = {"v": value, "delta": delta, "exp": time.time() + ttl_seconds}
+        entry["size"] = await self._write(key, entry, ttl_seconds)
+        self._remember(key, entry)
+        await self._publish_invalidation(key)
+        return value
+
+    def _remember(self, key: str, entry: dict) -> None:
+        if self.local is None:
+            return
+        expires_at = min(float(entry.get("exp") or 0.0), time.time() + settings.cache_local_ttl_seconds)
+        self.local.set(key, entry["v"], size=int(entry.get("size") or 0), expires_at=expires_at)
+
+    async def invalidate(self, key: str) -> None:
+        if self.local is not None:
+            self.local.invalidate(key)
+        try:
+            await self.redis.delete(key)
+        except RedisError:
+            self.stats.redis_errors += 1
+        await self._publish_invalidation(key)
+
+    async def _publish_invalidation(self, key: str) -> None:
+        try:
+            await self.redis.publish(_INVALIDATE_CHANNEL, json.dumps({"key": key, "origin": self.origin}))
+        except RedisError:
+            self.stats.redis_errors += 1
+
+    def start_invalidation_listener(self) -> None:
+        if self.local is not None and self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(_INVALIDATE_CHANNEL)
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                try:
+                    body = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+                if body.get("origin") != self.origin and self.local is not None:
+                    self.local.invalidate(str(body.get("key")))
+                    self.stats.invalidations += 1
+        except RedisError:
+            self.stats.redis_errors += 1
+        finally:
+            await pubsub.aclose()
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _read(self, key: str) -> dict | None:
+        started = time.perf_counter()
+        try:
+            raw = await self.redis.get(key)
+        except RedisError:
+            self.stats.redis_errors += 1
+            return None
+        finally:
+            self.stats.read_ms_total += (time.perf_counter() - started) * 1000
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        entry["size"] = len(raw)
+        return entry
+
+    async def _write(self, key: str, entry: dict, ttl_seconds: int) -> int:
+        raw = json.dumps(entry)
+        if ttl_seconds <= 0:
+            return len(raw)
+        try:
+            await self.redis.setex(key, ttl_seconds, raw)
+        except RedisError:
+            self.stats.redis_errors += 1
+        return len(raw)
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            if await self.redis.get(lock_key) == token:
+                await self.redis.delete(lock_key)
+        except RedisError:
+            self.stats.redis_errors += 1
@@ -1,12 +1,98 @@
 from __future__ import annotations
 
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.pool import StaticPool
 
 from tripsmith.core.config import settings
 
 
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    overflow_peak: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def observe(self, *, wait_ms: float, overflow: int, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.overflow_peak = max(self.overflow_peak, overflow)
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def snapshot(self) -> dict[str, int | float]:
+        with self._lock:
+            return asdict(self)
+
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class _TimedPoolMixin:
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            # The time spent here is what a request waits for a connection, including any overflow connect.
+            self.stats.observe(
+                wait_ms=(time.perf_counter() - started) * 1000,
+                overflow=max(0, self.overflow()),
+                timed_out=timed_out,
+            )
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    stats = sync_pool_stats
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
+
+
+def _pool_kwargs(*, poolclass) -> dict:
+    if settings.db_pgbouncer:
+        # PgBouncer owns pooling; in transaction mode server-side prepared statements break, so psycopg must not create them.
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": True,
+    }
+
+
 def _make_engine(database_url: str):
     if database_url.startswith("sqlite"):
         return create_engine(
@@ -14,17 +100,56 @@ def _make_engine(database_url: str):
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
-    return create_engine(database_url, pool_pre_ping=True)
+    return create_engine(database_url, **_pool_kwargs(poolclass=TimedQueuePool))
+
+
+def _async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    # psycopg 3 serves both engines from the same postgresql+psycopg URL.
+    return url.render_as_string(hide_password=False)
+
+
+def _make_async_engine(database_url: str):
+    if database_url.startswith("sqlite"):
+        return create_async_engine(
+            _async_url(database_url),
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    return create_async_engine(_async_url(database_url), **_pool_kwargs(poolclass=TimedAsyncQueuePool))
 
 
 engine = _make_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+async_engine = _make_async_engine(settings.database_url)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 def reconfigure_engine(database_url: str) -> None:
-    global engine, SessionLocal
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
     engine = _make_engine(database_url)
     SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    async_engine = _make_async_engine(database_url)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def pool_metrics() -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    for name, eng, stats in (("sync", engine, sync_pool_stats), ("async", async_engine.sync_engine, async_pool_stats)):
+        pool = eng.pool
+        row: dict = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            row.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        row.update(stats.snapshot())
+        out[name] = row
+    return out
 
 
 def get_db():
@@ -34,3 +159,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
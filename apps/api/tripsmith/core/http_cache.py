@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Awaitable
+from typing import Callable
+
+from fastapi import Response
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+
+# Responses are per-user, so shared caches must not store them; clients revalidate with If-None-Match.
+CACHE_CONTROL = "private, no-cache"
+
+
+def strong_etag(*parts: object) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str, separators=(",", ":"))
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison, so a W/ prefix on either side still matches.
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+async def cached_render(redis: AsyncRedis, key: str, *, ttl_seconds: int, render: Callable[[], Awaitable[str]]) -> str:
+    try:
+        hit = await redis.get(key)
+    except RedisError:
+        hit = None
+    if hit is not None:
+        return hit
+    body = await render()
+    try:
+        await redis.set(key, body, ex=ttl_seconds)
+    except RedisError:
+        pass
+    return body
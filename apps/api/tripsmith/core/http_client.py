@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from tripsmith.core.config import settings
+
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientRegistry:
+    def __init__(
+        self,
+        *,
+        max_connections_per_host: int,
+        max_keepalive_per_host: int,
+        keepalive_expiry_seconds: float,
+        http2: bool,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._http2 = http2 and _HTTP2_AVAILABLE
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(http2=self._http2, limits=self._limits, timeout=httpx.Timeout(10.0))
+            self._clients[origin] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+_REGISTRIES: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, HttpClientRegistry] = weakref.WeakKeyDictionary()
+
+
+def get_http_clients() -> HttpClientRegistry:
+    loop = asyncio.get_running_loop()
+    registry = _REGISTRIES.get(loop)
+    if registry is None:
+        registry = HttpClientRegistry(
+            max_connections_per_host=settings.http_max_connections_per_host,
+            max_keepalive_per_host=settings.http_max_keepalive_per_host,
+            keepalive_expiry_seconds=settings.http_keepalive_expiry_seconds,
+            http2=settings.http2_enabled,
+        )
+        _REGISTRIES[loop] = registry
+    return registry
+
+
+async def close_http_clients() -> None:
+    registry = _REGISTRIES.pop(asyncio.get_running_loop(), None)
+    if registry is not None:
+        await registry.aclose()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import time
+from typing import AsyncIterator
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from tripsmith.core.config import settings
+from tripsmith.schemas.jobs import JobDto
+
+
+_TERMINAL_STATUSES = ("succeeded", "failed")
+_HEARTBEAT_SECONDS = 15.0
+
+
+def progress_key(job_id: str) -> str:
+    return f"job:progress:{job_id}"
+
+
+def events_channel(job_id: str) -> str:
+    return f"job:events:{job_id}"
+
+
+def _progress_fields(*, status: str, stage: str, progress: int, message: str) -> dict:
+    return {
+        "status": status,
+        "stage": stage[:32],
+        "progress": int(progress),
+        "message": message[:256],
+        "updated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+    }
+
+
+def write_progress(redis: Redis, job_id: str, *, status: str, stage: str, progress: int, message: str) -> None:
+    fields = _progress_fields(status=status, stage=stage, progress=progress, message=message)
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.hset(progress_key(job_id), mapping=fields)
+        pipe.expire(progress_key(job_id), settings.job_progress_ttl_seconds)
+        pipe.publish(events_channel(job_id), json.dumps({"event": "progress", **fields}))
+        pipe.execute()
+    except RedisError:
+        pass
+
+
+def publish_job_result(redis: Redis, job: JobDto) -> None:
+    payload = job.model_dump(mode="json")
+    fields = _progress_fields(status=job.status, stage=job.stage, progress=job.progress, message=job.message)
+    try:
+        pipe = redis.pipeline(transaction=False)
+        # Kept next to the progress fields so a subscriber that just missed the publish still finds it.
+        pipe.hset(progress_key(job.id), mapping={**fields, "job": json.dumps(payload)})
+        pipe.expire(progress_key(job.id), settings.job_progress_ttl_seconds)
+        pipe.publish(events_channel(job.id), json.dumps({"event": "job", "job": payload}))
+        pipe.execute()
+    except RedisError:
+        pass
+
+
+def read_progress(redis: Redis, job_id: str) -> dict | None:
+    try:
+        raw = redis.hgetall(progress_key(job_id))
+    except RedisError:
+        return None
+    return _parse_progress(raw)
+
+
+async def read_progress_async(redis: AsyncRedis, job_id: str) -> dict | None:
+    try:
+        raw = await redis.hgetall(progress_key(job_id))
+    except RedisError:
+        return None
+    return _parse_progress(raw)
+
+
+def _parse_progress(raw: dict) -> dict | None:
+    if not raw:
+        return None
+    try:
+        return {
+            "status": raw["status"],
+            "stage": raw["stage"],
+            "progress": int(raw["progress"]),
+            "message": raw["message"],
+            "updated_at": dt.datetime.fromisoformat(raw["updated_at"]),
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def overlay_progress(job: JobDto, progress: dict | None) -> JobDto:
+    # The jobs row is authoritative once it reaches a terminal state.
+    if progress is None or job.status in _TERMINAL_STATUSES:
+        return job
+    return job.model_copy(update=progress)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_job_events(redis: AsyncRedis, job: JobDto) -> AsyncIterator[str]:
+    yield _sse("job", job.model_dump(mode="json"))
+    if job.status in _TERMINAL_STATUSES:
+        return
+    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(events_channel(job.id))
+        finished = await redis.hget(progress_key(job.id), "job")
+        if finished:
+            yield _sse("job", json.loads(finished))
+            return
+        deadline = time.monotonic() + settings.job_events_max_seconds
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(timeout=1.0)
+            if message is None:
+                if time.monotonic() - last_sent >= _HEARTBEAT_SECONDS:
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                continue
+            try:
+                body = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            event = body.pop("event", "progress")
+            if event == "job":
+                yield _sse("job", body["job"])
+                return
+            yield _sse(event, body)
+            last_sent = time.monotonic()
+    except RedisError:
+        return
+    finally:
+        await pubsub.aclose()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from sqlalchemy import Select
+from sqlalchemy import and_
+from sqlalchemy import select
+
+from tripsmith.models.trip import Trip
+
+
+def latest_child_id(model):
+    # Correlated to the enclosing Trip row. The LIMIT 1 is a single probe of the (trip_id, created_at DESC)
+    # index on Postgres and SQLite alike, which LATERAL is not.
+    return (
+        select(model.id)
+        .where(model.trip_id == Trip.id)
+        .order_by(model.created_at.desc())
+        .limit(1)
+        .correlate(Trip)
+        .scalar_subquery()
+    )
+
+
+def trip_with_latest(model, *, trip_id: str, user_id: str, row_id: str | None = None, options: tuple = ()) -> Select:
+    # One round-trip for the owned trip and its newest (or given) child row.
+    target = latest_child_id(model) if row_id is None else row_id
+    return (
+        select(Trip, model)
+        .outerjoin(model, and_(model.trip_id == Trip.id, model.id == target))
+        .where(Trip.id == trip_id, Trip.user_id == user_id)
+        .options(*options)
+    )
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
+import queue
+import random
 import sys
+import threading
 import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
 from typing import Any
 
+from tripsmith.core.config import settings
 from tripsmith.core.sanitize import redact_obj
 
 
@@ -14,25 +23,129 @@ _LOGGER = logging.getLogger("tripsmith")
 _NO_REDACT_KEYS = {"request_id", "path", "method", "latency_ms", "status_code", "user_id", "trip_id"}
 
 
+@dataclass
+class LogStats:
+    enqueued: int = 0
+    dropped: int = 0
+    sampled_out: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return asdict(self)
+
+
+log_stats = LogStats()
+
+
+def format_event(payload: dict[str, Any]) -> str:
+    cleaned: dict[str, Any] = {}
+    for k, v in payload.items():
+        # Non-string scalars cannot carry an email or phone number; skip the recursive walk for them.
+        if k in _NO_REDACT_KEYS or v is None or isinstance(v, (int, float, bool)):
+            cleaned[k] = v
+        else:
+            cleaned[k] = redact_obj(v)
+    try:
+        return json.dumps(cleaned, ensure_ascii=False, separators=(",", ":"))
+    except Exception:
+        return '{"event":"log_failed"}'
+
+
+class _EventFormatter(logging.Formatter):
+    def __init__(self, stats: LogStats):
+        super().__init__()
+        self.stats = stats
+        self._reported_drops = 0
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = format_event(record.msg) if isinstance(record.msg, dict) else str(record.msg)
+        dropped = self.stats.dropped
+        if dropped > self._reported_drops:
+            line += "\n" + format_event({"event": "log_dropped", "ts": time.time(), "count": dropped - self._reported_drops})
+            self._reported_drops = dropped
+        return line
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, q: queue.Queue, *, stats: LogStats):
+        super().__init__(q)
+        self.stats = stats
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting and redaction happen on the listener thread, so logged values must not be mutated afterwards.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.stats.incr("dropped")
+            return
+        self.stats.incr("enqueued")
+
+
+_listener: QueueListener | None = None
+_listener_pid: int | None = None
+_configure_lock = threading.Lock()
+
+
 def configure_logging() -> None:
-    if _LOGGER.handlers:
+    global _listener, _listener_pid
+    if _listener_pid == os.getpid():
         return
-    level_name = os.getenv("LOG_LEVEL", "INFO").upper()
-    level = getattr(logging, level_name, logging.INFO)
-    _LOGGER.setLevel(level)
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
-    _LOGGER.addHandler(handler)
-    _LOGGER.propagate = False
+    with _configure_lock:
+        if _listener_pid == os.getpid():
+            return
+        # A forked child inherits the handlers but not the listener thread; rebuild both.
+        for handler in list(_LOGGER.handlers):
+            _LOGGER.removeHandler(handler)
+        level_name = os.getenv("LOG_LEVEL", "INFO").upper()
+        level = getattr(logging, level_name, logging.INFO)
+        _LOGGER.setLevel(level)
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setLevel(level)
+        stream.setFormatter(_EventFormatter(log_stats))
+        q: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+        _LOGGER.addHandler(DroppingQueueHandler(q, stats=log_stats))
+        _LOGGER.propagate = False
+        _listener = QueueListener(q, stream, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def flush_logs() -> None:
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.queue.join()
+
+
+def _stop_listener() -> None:
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+def _sampled_out(event: str, fields: dict[str, Any]) -> bool:
+    if event != "http_request" or settings.log_http_sample_rate >= 1.0:
+        return False
+    status = fields.get("status_code")
+    # Failures and slow requests are always kept; sampling only thins the healthy bulk.
+    if status is None or status >= 500 or (fields.get("latency_ms") or 0) >= settings.log_slow_request_ms:
+        return False
+    return random.random() >= settings.log_http_sample_rate
 
 
 def log_event(event: str, **fields: Any) -> None:
     configure_logging()
-    cleaned: dict[str, Any] = {}
-    for k, v in fields.items():
-        cleaned[k] = v if k in _NO_REDACT_KEYS else redact_obj(v)
-    payload = {"event": event, "ts": time.time(), **cleaned}
-    try:
-        _LOGGER.info(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
-    except Exception:
-        _LOGGER.info('{"event":"log_failed"}')
+    if _sampled_out(event, fields):
+        log_stats.incr("sampled_out")
+        return
+    _LOGGER.info({"event": event, "ts": time.time(), **fields})
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Coroutine
+
+
+class LoopRunner:
+    def __init__(self, *, name: str):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked child inherits the object but not the thread; start a fresh loop there.
+            if self._loop is not None and self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=serve, name=self.name, daemon=True)
+            thread.start()
+            started.wait()
+            self._loop = loop
+            self._thread = thread
+            self._pid = os.getpid()
+            return loop
+
+    def run(self, coro: Coroutine[Any, Any, Any], *, timeout: float | None = None) -> Any:
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, cleanup: Callable[[], Awaitable[None]] | None = None) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            alive = loop is not None and thread is not None and thread.is_alive() and self._pid == os.getpid()
+            self._loop = None
+            self._thread = None
+            self._pid = None
+        if not alive:
+            return
+        if cleanup is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(cleanup(), loop).result(10)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        if not thread.is_alive():
+            loop.close()
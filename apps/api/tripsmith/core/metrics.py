@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import REGISTRY
+from prometheus_client import Counter
+from prometheus_client import Histogram
+from prometheus_client import generate_latest
+from prometheus_client import start_http_server
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.core import GaugeMetricFamily
+
+from tripsmith.core.cache import cache_stats
+from tripsmith.core.db import pool_metrics
+from tripsmith.core.logging import log_stats
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+_UNMATCHED_ROUTE = "unmatched"
+
+# Default buckets top out at 10s; jobs and provider calls regularly run longer than that.
+_JOB_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+_PROVIDER_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+
+http_request_seconds = Histogram(
+    "tripsmith_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+job_stage_seconds = Histogram(
+    "tripsmith_job_stage_duration_seconds",
+    "Time a job spent in each progress stage.",
+    ("job_type", "stage"),
+    buckets=_JOB_BUCKETS,
+)
+job_seconds = Histogram(
+    "tripsmith_job_duration_seconds",
+    "Job wall time from the first stage to success or failure.",
+    ("job_type", "status"),
+    buckets=_JOB_BUCKETS,
+)
+provider_call_seconds = Histogram(
+    "tripsmith_provider_call_duration_seconds",
+    "Provider call latency; the error rate is the outcome=\"error\" share of the count.",
+    ("provider", "operation", "outcome"),
+    buckets=_PROVIDER_BUCKETS,
+)
+provider_cache_requests = Counter(
+    "tripsmith_provider_cache_requests",
+    "Cached provider lookups; result is hit when the provider was not called.",
+    ("cache", "result"),
+)
+
+
+def route_label(scope: dict) -> str:
+    # The route template, never the raw path, so trip and job ids do not become label values.
+    route = scope.get("route")
+    return getattr(route, "path", None) or _UNMATCHED_ROUTE
+
+
+@contextmanager
+def provider_call(provider: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        provider_call_seconds.labels(provider, operation, outcome).observe(time.perf_counter() - started)
+
+
+class JobStageTimer:
+    def __init__(self):
+        # job id -> (job type, current stage, stage started, job started)
+        self._running: dict[str, tuple[str, str, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def enter(self, *, job_id: str, job_type: str, stage: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            prev = self._running.get(job_id)
+            self._running[job_id] = (job_type, stage, now, prev[3] if prev else now)
+        if prev is not None:
+            job_stage_seconds.labels(prev[0], prev[1]).observe(now - prev[2])
+
+    def finish(self, *, job_id: str, status: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            prev = self._running.pop(job_id, None)
+        if prev is None:
+            return
+        job_stage_seconds.labels(prev[0], prev[1]).observe(now - prev[2])
+        job_seconds.labels(prev[0], status).observe(now - prev[3])
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._running.pop(job_id, None)
+
+
+job_stages = JobStageTimer()
+
+
+class _StatsCollector:
+    # Exposes the in-process stats dataclasses at scrape time instead of mirroring every increment.
+    def collect(self):
+        cache = CounterMetricFamily("tripsmith_cache_events", "Provider cache counters.", labels=("event",))
+        for name, value in cache_stats.snapshot().items():
+            if isinstance(value, int):
+                cache.add_metric((name,), value)
+        yield cache
+
+        logs = CounterMetricFamily("tripsmith_log_records", "Log records by outcome.", labels=("outcome",))
+        for name, value in log_stats.snapshot().items():
+            logs.add_metric((name,), value)
+        yield logs
+
+        connections = GaugeMetricFamily("tripsmith_db_pool_connections", "Pooled connections by state.", labels=("engine", "state"))
+        checkouts = CounterMetricFamily("tripsmith_db_pool_checkouts", "Pool checkouts by outcome.", labels=("engine", "outcome"))
+        wait = CounterMetricFamily("tripsmith_db_pool_wait_seconds", "Total time spent waiting for a connection.", labels=("engine",))
+        for engine_name, row in pool_metrics().items():
+            for state in ("size", "checked_out", "checked_in", "overflow"):
+                if state in row:
+                    connections.add_metric((engine_name, state), row[state])
+            checkouts.add_metric((engine_name, "ok"), row["checkouts"])
+            checkouts.add_metric((engine_name, "timeout"), row["timeouts"])
+            wait.add_metric((engine_name,), row["wait_ms_total"] / 1000)
+        yield connections
+        yield checkouts
+        yield wait
+
+
+REGISTRY.register(_StatsCollector())
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+def start_metrics_server(port: int) -> None:
+    start_http_server(port, registry=REGISTRY)
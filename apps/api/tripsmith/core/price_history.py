@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import case
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+
+from tripsmith.core.config import settings
+from tripsmith.models.price_history import PricePoint
+from tripsmith.models.price_history import PriceRollup
+
+
+GRANULARITIES = ("hour", "day")
+
+
+def bucket_start(ts: dt.datetime, granularity: str) -> dt.datetime:
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _insert(db: Session, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise RuntimeError(f"price history upserts are not supported on {dialect}")
+
+
+def record_prices(db: Session, prices: dict[tuple[str, str], float], *, observed_at: dt.datetime) -> None:
+    if not prices:
+        return
+    # Alerts on one trip can land in different shard tasks that upsert the same rollup rows concurrently;
+    # locking rows in one global key order keeps those transactions from deadlocking on Postgres.
+    ordered = sorted(prices.items())
+    points = [
+        {"trip_id": trip_id, "alert_type": alert_type, "observed_at": observed_at, "price": price}
+        for (trip_id, alert_type), price in ordered
+    ]
+    db.execute(_insert(db, PricePoint).on_conflict_do_nothing(), points)
+
+    rollups = [
+        {
+            "trip_id": trip_id,
+            "alert_type": alert_type,
+            "granularity": granularity,
+            "bucket_start": bucket_start(observed_at, granularity),
+            "min_price": price,
+            "max_price": price,
+            "last_price": price,
+            "sample_count": 1,
+        }
+        for (trip_id, alert_type), price in ordered
+        for granularity in GRANULARITIES
+    ]
+    rollups.sort(key=lambda r: (r["trip_id"], r["alert_type"], r["granularity"], r["bucket_start"]))
+    stmt = _insert(db, PriceRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["trip_id", "alert_type", "granularity", "bucket_start"],
+        set_={
+            "min_price": case((stmt.excluded.min_price < PriceRollup.min_price, stmt.excluded.min_price), else_=PriceRollup.min_price),
+            "max_price": case((stmt.excluded.max_price > PriceRollup.max_price, stmt.excluded.max_price), else_=PriceRollup.max_price),
+            "last_price": stmt.excluded.last_price,
+            "sample_count": PriceRollup.sample_count + 1,
+        },
+    )
+    db.execute(stmt, rollups)
+
+
+def latest_hourly_prices(db: Session, keys: set[tuple[str, str]], *, now: dt.datetime) -> dict[tuple[str, str], float]:
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(PriceRollup.trip_id, PriceRollup.alert_type, PriceRollup.last_price).where(
+            PriceRollup.granularity == "hour",
+            PriceRollup.bucket_start == bucket_start(now, "hour"),
+            tuple_(PriceRollup.trip_id, PriceRollup.alert_type).in_(sorted(keys)),
+        )
+    ).all()
+    return {(r.trip_id, r.alert_type): float(r.last_price) for r in rows}
+
+
+def prune_expired_prices(db: Session, *, now: dt.datetime) -> dict[str, int]:
+    points = db.execute(
+        delete(PricePoint).where(PricePoint.observed_at < now - dt.timedelta(days=settings.price_points_retention_days))
+    ).rowcount
+    hourly = db.execute(
+        delete(PriceRollup).where(
+            PriceRollup.granularity == "hour",
+            PriceRollup.bucket_start < now - dt.timedelta(days=settings.price_hourly_retention_days),
+        )
+    ).rowcount
+    daily = db.execute(
+        delete(PriceRollup).where(
+            PriceRollup.granularity == "day",
+            PriceRollup.bucket_start < now - dt.timedelta(days=settings.price_daily_retention_days),
+        )
+    ).rowcount
+    db.commit()
+    return {"points": int(points or 0), "hourly": int(hourly or 0), "daily": int(daily or 0)}
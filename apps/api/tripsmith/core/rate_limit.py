@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from redis import Redis
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+
+from tripsmith.core.config import settings
 
 
 @dataclass(frozen=True)
@@ -13,22 +20,112 @@ class RateLimitResult:
     retry_after_seconds: int
 
 
-def check_rate_limit(
-    redis: Redis,
-    *,
-    user_id: str,
-    route: str,
-    limit_per_minute: int,
-) -> RateLimitResult:
-    now = int(time.time())
-    window = now // 60
-    key = f"rl:{user_id}:{route}:{window}"
-    count = int(redis.incr(key))
-    if count == 1:
-        redis.expire(key, 75)
-    remaining = max(0, limit_per_minute - count)
-    if count <= limit_per_minute:
-        return RateLimitResult(True, remaining, 0)
-    retry_after = 60 - (now % 60)
-    return RateLimitResult(False, 0, retry_after)
+@dataclass(frozen=True)
+class RateLimitRule:
+    limit: int
+    period_seconds: int
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, (self.period_seconds * 1000) // self.limit)
+
+
+# GCRA over every rule in one round-trip: a request is admitted only if all rules admit it, and
+# only then are the theoretical arrival times advanced. Redis TIME keeps API nodes on one clock.
+_GCRA_LUA = b"""
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local tats = {}
+local remaining = -1
+local retry_ms = 0
+for i = 1, #KEYS do
+  local interval = tonumber(ARGV[2 * i - 1])
+  local capacity = tonumber(ARGV[2 * i])
+  local tat = math.max(tonumber(redis.call('GET', KEYS[i]) or 0), now_ms)
+  local new_tat = tat + interval
+  local wait = new_tat - now_ms - capacity
+  if wait > 0 then
+    retry_ms = math.max(retry_ms, wait)
+  else
+    tats[i] = new_tat
+    local left = math.floor((capacity - (new_tat - now_ms)) / interval)
+    if remaining < 0 or left < remaining then
+      remaining = left
+    end
+  end
+end
+if retry_ms > 0 then
+  return {0, 0, retry_ms}
+end
+for i = 1, #KEYS do
+  redis.call('SET', KEYS[i], tats[i], 'PX', tats[i] - now_ms)
+end
+return {1, remaining, 0}
+"""
+
+_gcra = Script(None, _GCRA_LUA)
+
+
+def route_rules(route: str) -> tuple[RateLimitRule, ...]:
+    per_minute = int(settings.rate_limit_routes.get(route, settings.rate_limit_per_minute))
+    rules = [RateLimitRule(limit=max(1, per_minute), period_seconds=60)]
+    if settings.rate_limit_per_hour > 0:
+        rules.append(RateLimitRule(limit=settings.rate_limit_per_hour, period_seconds=3600))
+    return tuple(rules)
+
+
+def _retry_seconds(wait_ms: float) -> int:
+    return max(1, math.ceil(wait_ms / 1000))
+
+
+# Same rates as the shared limiter. A process only sees part of the traffic, so an empty local
+# bucket means the shared limit is exhausted too and the request can be refused without Redis.
+class LocalTokenBuckets:
+    def __init__(self, *, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: tuple, rules: tuple[RateLimitRule, ...], *, now: float) -> float:
+        with self._lock:
+            updated: list[tuple[tuple, tuple[float, float]]] = []
+            wait = 0.0
+            for rule in rules:
+                rule_key = (*key, rule.period_seconds)
+                rate = rule.limit / rule.period_seconds
+                tokens, stamp = self._buckets.get(rule_key, (float(rule.limit), now))
+                tokens = min(float(rule.limit), tokens + (now - stamp) * rate)
+                if tokens < 1.0:
+                    wait = max(wait, (1.0 - tokens) / rate)
+                updated.append((rule_key, (tokens - 1.0, now)))
+            if wait > 0:
+                return wait
+            for rule_key, state in updated:
+                self._buckets[rule_key] = state
+                self._buckets.move_to_end(rule_key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+
+class RateLimiter:
+    def __init__(self, *, local_max_keys: int | None = None):
+        self.local = LocalTokenBuckets(max_keys=local_max_keys or settings.rate_limit_local_max_keys)
 
+    def check(self, redis: Redis, *, user_id: str, route: str) -> RateLimitResult:
+        rules = route_rules(route)
+        wait = self.local.take((user_id, route), rules, now=time.monotonic())
+        if wait > 0:
+            return RateLimitResult(False, 0, _retry_seconds(wait * 1000))
+        keys = [f"rl:{{{user_id}}}:{route}:{rule.period_seconds}" for rule in rules]
+        args: list[int] = []
+        for rule in rules:
+            args.extend((rule.interval_ms, rule.interval_ms * rule.limit))
+        try:
+            allowed, remaining, retry_ms = _gcra(keys=keys, args=args, client=redis)
+        except RedisError:
+            # The local bucket already admitted this request; serve on that rather than fail closed.
+            return RateLimitResult(True, 0, 0)
+        if int(allowed):
+            return RateLimitResult(True, int(remaining), 0)
+        return RateLimitResult(False, 0, _retry_seconds(int(retry_ms)))
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 from tripsmith.core.config import settings
 
@@ -14,3 +15,11 @@ def get_redis() -> Redis:
         return fakeredis.FakeRedis(decode_responses=True)
     return Redis.from_url(settings.redis_url, decode_responses=True)
 
+
+
+def get_async_redis() -> AsyncRedis:
+    if os.getenv("FAKE_REDIS", "0") == "1":
+        import fakeredis
+
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+    return AsyncRedis.from_url(settings.redis_url, decode_responses=True)
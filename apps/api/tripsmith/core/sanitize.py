@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import itertools
 import re
 from typing import Any
 
 
 _SAFE_TEXT_RE = re.compile(r"[^\w\s,.;:/+\-()#]", re.UNICODE)
-_EMAIL_RE = re.compile(r"(?i)\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b")
-_PHONE_RE = re.compile(r"(?:(?<=\D)|^)(?:\+?\d[\d\s().-]{7,}\d)(?:(?=\D)|$)")
+_EMAIL = r"\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b"
+# Emails and phones in one scan. Redacting emails first used to stop a phone from running into one, so no
+# phone digit or separator may be where an email starts.
+_PII_RE = re.compile(
+    f"(?i)(?P<email>{_EMAIL})"
+    rf"|(?:(?<=\D)|^)\+?(?!{_EMAIL})\d(?:(?!{_EMAIL})[\d\s().-]){{7,}}(?!{_EMAIL})\d(?:(?=\D)|$)"
+)
+_DIGIT_RE = re.compile(r"\d")
 
 
 def sanitize_text(value: str) -> str:
@@ -15,13 +22,21 @@ def sanitize_text(value: str) -> str:
     return value[:256]
 
 
+def _replace_pii(match: re.Match) -> str:
+    return "[REDACTED_EMAIL]" if match.group("email") is not None else "[REDACTED_PHONE]"
+
+
 def redact_text(value: str) -> str:
-    value = _EMAIL_RE.sub("[REDACTED_EMAIL]", value)
-    value = _PHONE_RE.sub("[REDACTED_PHONE]", value)
-    return value
+    # Most strings hold neither an @ nor a digit; both checks run in C and skip the regex entirely.
+    if "@" not in value and _DIGIT_RE.search(value) is None:
+        return value
+    # sub returns the input object itself when nothing matched, which redact_obj relies on.
+    return _PII_RE.sub(_replace_pii, value)
 
 
 def redact_obj(obj: Any) -> Any:
+    # Copy-on-write: a subtree with nothing to redact comes back as the same object, so large clean tool
+    # outputs are walked but never copied. Results may share structure with the input and must not be mutated.
     if obj is None:
         return None
     if isinstance(obj, str):
@@ -29,14 +44,35 @@ def redact_obj(obj: Any) -> Any:
     if isinstance(obj, (int, float, bool)):
         return obj
     if isinstance(obj, list):
-        return [redact_obj(v) for v in obj]
+        return _redact_list(obj)
     if isinstance(obj, tuple):
+        # Tuples have always come back as lists; keep that so stored JSON does not change shape.
         return [redact_obj(v) for v in obj]
     if isinstance(obj, dict):
-        redacted: dict[Any, Any] = {}
-        for k, v in obj.items():
-            key = redact_text(k) if isinstance(k, str) else k
-            redacted[key] = redact_obj(v)
-        return redacted
+        return _redact_dict(obj)
     return str(obj)
 
+
+def _redact_list(obj: list) -> list:
+    out: list | None = None
+    for i, v in enumerate(obj):
+        new = redact_obj(v)
+        if out is None:
+            if new is v:
+                continue
+            out = obj[:i]
+        out.append(new)
+    return obj if out is None else out
+
+
+def _redact_dict(obj: dict) -> dict:
+    out: dict | None = None
+    for i, (k, v) in enumerate(obj.items()):
+        key = redact_text(k) if isinstance(k, str) else k
+        new = redact_obj(v)
+        if out is None:
+            if key is k and new is v:
+                continue
+            out = dict(itertools.islice(obj.items(), i))
+        out[key] = new
+    return obj if out is None else out
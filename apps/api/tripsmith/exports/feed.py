@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import hmac
+from typing import AsyncIterator
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tripsmith.core import db as db_core
+from tripsmith.core.config import settings
+from tripsmith.core.http_cache import strong_etag
+from tripsmith.core.loaders import latest_child_id
+from tripsmith.exports.ics import CALENDAR_FOOTER
+from tripsmith.exports.ics import calendar_header
+from tripsmith.exports.ics import iter_events
+from tripsmith.exports.ics import stored_event_blocks
+from tripsmith.models.itinerary import Itinerary
+from tripsmith.models.trip import Trip
+from tripsmith.schemas.itinerary import ItineraryJson
+
+
+def feed_token(user_id: str) -> str:
+    secret = (settings.calendar_feed_secret or "").encode("utf-8")
+    return hmac.new(secret, f"calendar:{user_id}".encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def feed_token_valid(user_id: str, token: str | None) -> bool:
+    if not settings.calendar_feed_secret or not token:
+        return False
+    return hmac.compare_digest(feed_token(user_id), token)
+
+
+async def feed_etag(db: AsyncSession, user_id: str) -> str:
+    # Itineraries are append-only, so any change to the feed adds a row and moves the count. created_at is taken
+    # before a job commits, so it is not a safe Last-Modified and only feeds the ETag.
+    count, newest = (
+        await db.execute(
+            select(func.count(Itinerary.id), func.max(Itinerary.created_at))
+            .join(Trip, Trip.id == Itinerary.trip_id)
+            .where(Trip.user_id == user_id)
+        )
+    ).one()
+    if newest is not None and newest.tzinfo is None:
+        newest = newest.replace(tzinfo=dt.timezone.utc)
+    return strong_etag("feed", user_id, count, newest)
+
+
+async def stream_user_calendar(user_id: str) -> AsyncIterator[str]:
+    # The response outlives request-scoped dependencies, so the generator owns its session. Rows come off a
+    # server-side cursor in yield_per batches and each trip is written out before the next is read.
+    stmt = (
+        select(Trip.id, Itinerary.id.label("itinerary_id"), Itinerary.created_at, Itinerary.itinerary_ics)
+        .join(Itinerary, Itinerary.id == latest_child_id(Itinerary))
+        .where(Trip.user_id == user_id)
+        .order_by(Trip.start_date, Trip.id)
+        .execution_options(yield_per=settings.calendar_feed_batch_size)
+    )
+    yield calendar_header(name="TripSmith")
+    async with db_core.AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for row in result:
+            # Events rendered at persist time are spliced in as stored; only older rows are rendered here.
+            blocks = stored_event_blocks(row.itinerary_ics) if row.itinerary_ics else None
+            if blocks is None:
+                body = await db.scalar(select(Itinerary.itinerary_json).where(Itinerary.id == row.itinerary_id))
+                blocks = "".join(iter_events(trip_id=row.id, itinerary=ItineraryJson.model_validate(body), stamp=row.created_at))
+            yield blocks
+    yield CALENDAR_FOOTER
@@ -1,35 +1,102 @@
 from __future__ import annotations
 
 import datetime as dt
+from typing import Iterator
 
 from tripsmith.schemas.itinerary import ItineraryJson
 
 
-def to_ics(*, trip_id: str, itinerary: ItineraryJson) -> str:
-    now = dt.datetime.now(dt.timezone.utc)
-    lines: list[str] = []
-    lines.append("BEGIN:VCALENDAR\r\n")
-    lines.append("VERSION:2.0\r\n")
-    lines.append("PRODID:-//TripSmith//EN\r\n")
+_PERIOD_OFFSETS = {"morning": 0, "afternoon": 4, "evening": 8}
+_MAX_LINE_OCTETS = 75
+# SEQUENCE must grow whenever a trip's events are regenerated. Seconds since this epoch do that without a
+# per-trip counter and stay inside a signed 32-bit INTEGER until 2092.
+_SEQUENCE_EPOCH = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def calendar_header(*, name: str | None = None) -> str:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//TripSmith//EN"]
+    if name:
+        lines.append(f"X-WR-CALNAME:{_escape(name)}")
+    return "".join(_fold(line) for line in lines)
+
+
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+
+def _utc(stamp: dt.datetime) -> dt.datetime:
+    # Values read back from the DB carry the session's time zone, or none at all on SQLite.
+    if stamp.tzinfo is None:
+        return stamp.replace(tzinfo=dt.timezone.utc)
+    return stamp.astimezone(dt.timezone.utc)
+
+
+def event_sequence(stamp: dt.datetime) -> int:
+    return max(0, int((_utc(stamp) - _SEQUENCE_EPOCH).total_seconds()))
+
+
+def iter_events(*, trip_id: str, itinerary: ItineraryJson, stamp: dt.datetime) -> Iterator[str]:
+    dtstamp = _utc(stamp).strftime("%Y%m%dT%H%M%SZ")
+    sequence = event_sequence(stamp)
     for day in itinerary.days:
         base = dt.datetime.combine(day.date, dt.time(9, 0), tzinfo=dt.timezone.utc)
-        offsets = {"morning": 0, "afternoon": 4, "evening": 8}
         for item in day.items:
-            start = base + dt.timedelta(hours=offsets[item.period])
+            start = base + dt.timedelta(hours=_PERIOD_OFFSETS[item.period])
             end = start + dt.timedelta(minutes=item.stay_minutes)
             uid = f"{trip_id}-{day.date.isoformat()}-{item.period}@tripsmith"
-            lines.append("BEGIN:VEVENT\r\n")
-            lines.append(f"UID:{uid}\r\n")
-            lines.append(f"DTSTAMP:{now.strftime('%Y%m%dT%H%M%SZ')}\r\n")
-            lines.append(f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}\r\n")
-            lines.append(f"DTEND:{end.strftime('%Y%m%dT%H%M%SZ')}\r\n")
-            lines.append(f"SUMMARY:{_escape(item.poi_name)}\r\n")
-            lines.append(f"DESCRIPTION:{_escape(item.weather_summary)}\r\n")
-            lines.append("END:VEVENT\r\n")
-    lines.append("END:VCALENDAR\r\n")
-    return "".join(lines)
+            yield "".join(
+                _fold(line)
+                for line in (
+                    "BEGIN:VEVENT",
+                    f"UID:{uid}",
+                    f"DTSTAMP:{dtstamp}",
+                    f"LAST-MODIFIED:{dtstamp}",
+                    f"SEQUENCE:{sequence}",
+                    f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}",
+                    f"DTEND:{end.strftime('%Y%m%dT%H%M%SZ')}",
+                    f"SUMMARY:{_escape(item.poi_name)}",
+                    f"DESCRIPTION:{_escape(item.weather_summary)}",
+                    "END:VEVENT",
+                )
+            )
 
 
-def _escape(value: str) -> str:
-    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+def iter_ics(*, trip_id: str, itinerary: ItineraryJson, stamp: dt.datetime | None = None) -> Iterator[str]:
+    yield calendar_header()
+    yield from iter_events(trip_id=trip_id, itinerary=itinerary, stamp=stamp or dt.datetime.now(dt.timezone.utc))
+    yield CALENDAR_FOOTER
+
+
+def stored_event_blocks(ics: str) -> str | None:
+    # The VEVENT section of a calendar stored by to_ics, or None when it predates the current event format.
+    header = calendar_header()
+    if not ics.startswith(header) or not ics.endswith(CALENDAR_FOOTER) or "\r\nSEQUENCE:" not in ics:
+        return None
+    return ics[len(header) : -len(CALENDAR_FOOTER)]
+
+
+def to_ics(*, trip_id: str, itinerary: ItineraryJson, stamp: dt.datetime | None = None) -> str:
+    return "".join(iter_ics(trip_id=trip_id, itinerary=itinerary, stamp=stamp))
 
+
+def _fold(line: str) -> str:
+    # RFC 5545 3.1: at most 75 octets per line, continuations start with one space, never split a UTF-8 sequence.
+    if len(line.encode("utf-8")) <= _MAX_LINE_OCTETS:
+        return line + "\r\n"
+    parts: list[str] = []
+    start = 0
+    size = 0
+    limit = _MAX_LINE_OCTETS
+    for i, ch in enumerate(line):
+        width = len(ch.encode("utf-8"))
+        if size + width > limit:
+            parts.append(line[start:i])
+            start = i
+            size = 0
+            limit = _MAX_LINE_OCTETS - 1
+        size += width
+    parts.append(line[start:])
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
@@ -3,38 +3,70 @@ from __future__ import annotations
 import datetime as dt
 import time
 import os
+from typing import Literal
+from urllib.parse import urlencode
 
 from fastapi import Depends
 from fastapi import FastAPI
 from fastapi import Header
 from fastapi import HTTPException
+from fastapi import Query
+from fastapi import Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.responses import PlainTextResponse
+from fastapi.responses import StreamingResponse
 from fastapi.requests import Request
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import defer
+from sqlalchemy.orm import undefer
 
 from tripsmith.agent.intake import generate_constraints
 from tripsmith.core.config import cors_origins
 from tripsmith.core.config import settings
+from tripsmith.core.db import get_async_db
 from tripsmith.core.db import get_db
+from tripsmith.core.db import pool_metrics
 from tripsmith.core.errors import ApiException
 from tripsmith.core.errors import ErrorCategory
 from tripsmith.core.errors import make_error_code
+from tripsmith.core.http_cache import CACHE_CONTROL
+from tripsmith.core.http_cache import cached_render
+from tripsmith.core.http_cache import etag_matches
+from tripsmith.core.http_cache import not_modified
+from tripsmith.core.http_cache import strong_etag
 from tripsmith.core.ids import new_id
+from tripsmith.core.job_progress import overlay_progress
+from tripsmith.core.job_progress import read_progress
+from tripsmith.core.job_progress import read_progress_async
+from tripsmith.core.job_progress import stream_job_events
+from tripsmith.core.loaders import trip_with_latest
 from tripsmith.core.logging import log_event
-from tripsmith.core.rate_limit import check_rate_limit
+from tripsmith.core.metrics import METRICS_CONTENT_TYPE
+from tripsmith.core.metrics import http_request_seconds
+from tripsmith.core.metrics import render_metrics
+from tripsmith.core.metrics import route_label
+from tripsmith.core.rate_limit import RateLimiter
+from tripsmith.core.redis_client import get_async_redis
 from tripsmith.core.redis_client import get_redis
 from tripsmith.core.sanitize import sanitize_text
 from tripsmith.core.sanitize import redact_obj
+from tripsmith.exports.feed import feed_etag
+from tripsmith.exports.feed import feed_token
+from tripsmith.exports.feed import feed_token_valid
+from tripsmith.exports.feed import stream_user_calendar
 from tripsmith.exports.ics import to_ics
 from tripsmith.models.alert import Alert
 from tripsmith.models.agent_run import AgentRun
 from tripsmith.models.itinerary import Itinerary
 from tripsmith.models.job import Job
 from tripsmith.models.plan import Plan
+from tripsmith.models.price_history import PriceRollup
 from tripsmith.models.saved_plan import SavedPlan
 from tripsmith.models.trip import Trip
 from tripsmith.schemas.alerts import AlertCreateRequest
@@ -42,12 +74,16 @@ from tripsmith.schemas.alerts import AlertCreateResponse
 from tripsmith.schemas.alerts import AlertDto
 from tripsmith.schemas.agent_runs import AgentRunDto
 from tripsmith.schemas.agent_runs import AgentRunListResponse
+from tripsmith.schemas.calendar import CalendarFeedResponse
 from tripsmith.schemas.constraints import ConstraintsGenerateResponse
 from tripsmith.schemas.constraints import ConstraintsGetResponse
 from tripsmith.schemas.constraints import ConstraintsUpdateRequest
 from tripsmith.schemas.itinerary import ItineraryCreateRequest
 from tripsmith.schemas.jobs import JobCreateResponse
 from tripsmith.schemas.jobs import JobDto
+from tripsmith.schemas.plan import PlanCreateResponse
+from tripsmith.schemas.price_history import PriceBucketDto
+from tripsmith.schemas.price_history import PriceHistoryResponse
 from tripsmith.schemas.saved_plans import SavePlanRequest
 from tripsmith.schemas.saved_plans import SavedPlanDto
 from tripsmith.schemas.saved_plans import SavePlanResponse
@@ -57,14 +93,30 @@ from tripsmith.schemas.trips import TripCreateRequest
 from tripsmith.schemas.trips import TripDto
 
 
+# Each export reads only its own stored rendering; the itinerary JSON is needed only for rows predating itinerary_ics.
+_ICS_COLUMNS = (defer(Itinerary.itinerary_json), defer(Itinerary.itinerary_md), undefer(Itinerary.itinerary_ics))
+_MD_COLUMNS = (defer(Itinerary.itinerary_json),)
+
+
 def redis_dep() -> Redis:
     return get_redis()
 
 
+_async_redis: AsyncRedis | None = None
+
+
+def async_redis_dep() -> AsyncRedis:
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = get_async_redis()
+    return _async_redis
+
+
 def create_app() -> FastAPI:
     docs_url = None if settings.disable_docs else "/docs"
     redoc_url = None if settings.disable_docs else "/redoc"
     app = FastAPI(title="TripSmith API", version="0.2.1", docs_url=docs_url, redoc_url=redoc_url)
+    rate_limiter = RateLimiter()
 
     app.add_middleware(
         CORSMiddleware,
@@ -110,7 +162,10 @@ def create_app() -> FastAPI:
             response.headers["X-Request-Id"] = request_id
             return response
         finally:
-            latency_ms = int((time.perf_counter() - started) * 1000)
+            elapsed = time.perf_counter() - started
+            latency_ms = int(elapsed * 1000)
+            status_code = getattr(response, "status_code", None) if response is not None else None
+            http_request_seconds.labels(request.method, route_label(request.scope), str(status_code or 500)).observe(elapsed)
             user_id = sanitize_text(request.headers.get("x-user-id") or "anonymous")
             trip_id = None
             path = request.url.path
@@ -125,7 +180,7 @@ def create_app() -> FastAPI:
                 path=path,
                 method=request.method,
                 latency_ms=latency_ms,
-                status_code=getattr(response, "status_code", None) if response is not None else None,
+                status_code=status_code,
                 user_id=user_id,
                 trip_id=trip_id,
             )
@@ -195,6 +250,10 @@ def create_app() -> FastAPI:
     def health():
         return {"ok": True, "ts": dt.datetime.now(dt.timezone.utc).isoformat()}
 
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
     @app.post("/api/trips", response_model=TripDto)
     def create_trip(
         payload: TripCreateRequest,
@@ -229,22 +288,34 @@ def create_app() -> FastAPI:
         return TripDto.model_validate(trip)
 
     @app.get("/api/trips/{trip_id}", response_model=TripGetResponse)
-    def get_trip(
+    async def get_trip(
         trip_id: str,
-        db: Session = Depends(get_db),
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
         x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+        if_none_match: str | None = Header(default=None, alias="If-None-Match"),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
-        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
-        if not trip:
+        row = (await db.execute(trip_with_latest(Plan, trip_id=trip_id, user_id=user_id))).first()
+        if not row:
             raise ApiException(
                 status_code=404,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
                 message="trip not found",
             )
-        plan: Plan | None = (
-            db.query(Plan).filter(Plan.trip_id == trip_id).order_by(Plan.created_at.desc()).first()
+        trip, plan = row
+        # Plans are immutable once written; the trip itself only changes through its constraints.
+        etag = strong_etag(
+            trip.id,
+            trip.constraints_json,
+            trip.constraints_confirmed_at,
+            plan.id if plan else None,
+            plan.created_at if plan else None,
         )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
         trip_dto = TripDto.model_validate(trip)
         if not plan:
             return TripGetResponse(trip=trip_dto, latest_plan_id=None, latest_plans_json=None, latest_explain_md=None)
@@ -352,7 +423,7 @@ def create_app() -> FastAPI:
                 message="constraints must be confirmed first",
             )
 
-        rl = check_rate_limit(redis, user_id=user_id, route="plan", limit_per_minute=settings.rate_limit_per_minute)
+        rl = rate_limiter.check(redis, user_id=user_id, route="plan")
         if not rl.allowed:
             raise ApiException(
                 status_code=429,
@@ -392,6 +463,62 @@ def create_app() -> FastAPI:
         run_plan_job.delay(job.id)
         return JobCreateResponse(job_id=job.id)
 
+    @app.post("/api/trips/{trip_id}/plan/rerank", response_model=PlanCreateResponse)
+    def rerank_plan(
+        trip_id: str,
+        db: Session = Depends(get_db),
+        x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+    ):
+        user_id = sanitize_text(x_user_id or "anonymous")
+        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
+        if not trip:
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
+                message="trip not found",
+            )
+        if trip.constraints_confirmed_at is None:
+            raise ApiException(
+                status_code=400,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "CONSTRAINTS_NOT_CONFIRMED"),
+                message="constraints must be confirmed first",
+            )
+        plan: Plan | None = (
+            db.query(Plan)
+            .options(undefer(Plan.candidates_json))
+            .filter(Plan.trip_id == trip_id)
+            .order_by(Plan.created_at.desc())
+            .first()
+        )
+        if plan is not None and plan.source_plan_id:
+            plan = (
+                db.query(Plan)
+                .options(undefer(Plan.candidates_json))
+                .filter(Plan.id == plan.source_plan_id, Plan.trip_id == trip_id)
+                .first()
+            )
+        if not plan or not plan.candidates_json:
+            raise ApiException(
+                status_code=409,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "PLAN_CANDIDATES_MISSING"),
+                message="no stored candidates; regenerate the plan",
+            )
+        from tripsmith.agent.orchestrator import rank_plans
+
+        plans_json, explain_md = rank_plans(trip=trip_to_dict(trip), candidates=plan.candidates_json)
+        reranked = Plan(
+            id=new_id(),
+            trip_id=trip_id,
+            created_at=dt.datetime.now(dt.timezone.utc),
+            plans_json=plans_json.model_dump(mode="json"),
+            explain_md=explain_md,
+            candidates_json=None,
+            source_plan_id=plan.id,
+        )
+        db.add(reranked)
+        db.commit()
+        return PlanCreateResponse(plan_id=reranked.id, plans_json=plans_json, explain_md=explain_md)
+
     @app.post("/api/trips/{trip_id}/itinerary", response_model=JobCreateResponse)
     def create_itinerary(
         trip_id: str,
@@ -401,17 +528,14 @@ def create_app() -> FastAPI:
         redis: Redis = Depends(redis_dep),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
-        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
-        if not trip:
+        row = db.execute(trip_with_latest(Plan, trip_id=trip_id, user_id=user_id, row_id=payload.plan_id or None)).first()
+        if not row:
             raise ApiException(
                 status_code=404,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
                 message="trip not found",
             )
-        if payload.plan_id:
-            plan = db.query(Plan).filter(Plan.id == payload.plan_id, Plan.trip_id == trip_id).first()
-        else:
-            plan = db.query(Plan).filter(Plan.trip_id == trip_id).order_by(Plan.created_at.desc()).first()
+        plan: Plan | None = row[1]
         if not plan:
             raise ApiException(
                 status_code=400,
@@ -428,7 +552,7 @@ def create_app() -> FastAPI:
                 message="plan_index out of range",
             )
 
-        rl = check_rate_limit(redis, user_id=user_id, route="itinerary", limit_per_minute=settings.rate_limit_per_minute)
+        rl = rate_limiter.check(redis, user_id=user_id, route="itinerary")
         if not rl.allowed:
             raise ApiException(
                 status_code=429,
@@ -469,12 +593,33 @@ def create_app() -> FastAPI:
         return JobCreateResponse(job_id=job.id)
 
     @app.get("/api/jobs/{job_id}", response_model=JobDto)
-    def get_job(
+    async def get_job(
         job_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+        async_redis: AsyncRedis = Depends(async_redis_dep),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
+        job: Job | None = await db.scalar(select(Job).where(Job.id == job_id, Job.user_id == user_id))
+        if not job:
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "JOB_NOT_FOUND"),
+                message="job not found",
+            )
+        return overlay_progress(JobDto.model_validate(job), await read_progress_async(async_redis, job.id))
+
+    @app.get("/api/jobs/{job_id}/events")
+    def job_events(
+        job_id: str,
+        db: Session = Depends(get_db),
+        x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+        user_id_param: str | None = Query(default=None, alias="user_id"),
+        redis: Redis = Depends(redis_dep),
+        async_redis: AsyncRedis = Depends(async_redis_dep),
+    ):
+        # EventSource cannot send custom headers, so browsers pass the user id as a query parameter.
+        user_id = sanitize_text(x_user_id or user_id_param or "anonymous")
         job: Job | None = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
         if not job:
             raise ApiException(
@@ -482,27 +627,29 @@ def create_app() -> FastAPI:
                 error_code=make_error_code(ErrorCategory.VALIDATION, "JOB_NOT_FOUND"),
                 message="job not found",
             )
-        return JobDto.model_validate(job)
+        snapshot = overlay_progress(JobDto.model_validate(job), read_progress(redis, job.id))
+        return StreamingResponse(
+            stream_job_events(async_redis, snapshot),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.get("/api/trips/{trip_id}/saved_plans", response_model=SavedPlansListResponse)
-    def list_saved_plans(
+    async def list_saved_plans(
         trip_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         x_user_id: str | None = Header(default=None, alias="X-User-Id"),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
-        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
+        trip: Trip | None = await db.scalar(select(Trip).where(Trip.id == trip_id, Trip.user_id == user_id))
         if not trip:
             raise ApiException(
                 status_code=404,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
                 message="trip not found",
             )
-        rows: list[SavedPlan] = (
-            db.query(SavedPlan)
-            .filter(SavedPlan.trip_id == trip_id)
-            .order_by(SavedPlan.created_at.desc())
-            .all()
+        rows: list[SavedPlan] = list(
+            await db.scalars(select(SavedPlan).where(SavedPlan.trip_id == trip_id).order_by(SavedPlan.created_at.desc()))
         )
         return SavedPlansListResponse(saved_plans=[SavedPlanDto.model_validate(r) for r in rows])
 
@@ -554,53 +701,148 @@ def create_app() -> FastAPI:
         return SavePlanResponse(saved_plan=SavedPlanDto.model_validate(row))
 
     @app.get("/api/trips/{trip_id}/export/ics", response_class=PlainTextResponse)
-    def export_ics(
+    async def export_ics(
         trip_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+        if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+        async_redis: AsyncRedis = Depends(async_redis_dep),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
-        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
-        if not trip:
+        row = (await db.execute(trip_with_latest(Itinerary, trip_id=trip_id, user_id=user_id, options=_ICS_COLUMNS))).first()
+        if not row:
             raise ApiException(
                 status_code=404,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
                 message="trip not found",
             )
-        it: Itinerary | None = db.query(Itinerary).filter(Itinerary.trip_id == trip_id).order_by(Itinerary.created_at.desc()).first()
+        it: Itinerary | None = row[1]
         if not it:
             raise ApiException(
                 status_code=400,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "ITINERARY_REQUIRED"),
                 message="itinerary required",
             )
-        from tripsmith.schemas.itinerary import ItineraryJson
+        etag = strong_etag("ics", it.id, it.created_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-        ics = to_ics(trip_id=trip_id, itinerary=ItineraryJson.model_validate(it.itinerary_json))
-        return PlainTextResponse(content=ics, media_type="text/calendar")
+        async def render() -> str:
+            from tripsmith.schemas.itinerary import ItineraryJson
+
+            body = await db.scalar(select(Itinerary.itinerary_json).where(Itinerary.id == it.id))
+            return to_ics(trip_id=trip_id, itinerary=ItineraryJson.model_validate(body), stamp=it.created_at)
+
+        ics = it.itinerary_ics
+        if ics is None:
+            ics = await cached_render(async_redis, f"export:ics:{it.id}", ttl_seconds=settings.export_cache_ttl_seconds, render=render)
+        return PlainTextResponse(content=ics, media_type="text/calendar", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
 
     @app.get("/api/trips/{trip_id}/export/md", response_class=PlainTextResponse)
-    def export_md(
+    async def export_md(
         trip_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+        if_none_match: str | None = Header(default=None, alias="If-None-Match"),
     ):
         user_id = sanitize_text(x_user_id or "anonymous")
-        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
-        if not trip:
+        row = (await db.execute(trip_with_latest(Itinerary, trip_id=trip_id, user_id=user_id, options=_MD_COLUMNS))).first()
+        if not row:
             raise ApiException(
                 status_code=404,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
                 message="trip not found",
             )
-        it: Itinerary | None = db.query(Itinerary).filter(Itinerary.trip_id == trip_id).order_by(Itinerary.created_at.desc()).first()
+        it: Itinerary | None = row[1]
         if not it:
             raise ApiException(
                 status_code=400,
                 error_code=make_error_code(ErrorCategory.VALIDATION, "ITINERARY_REQUIRED"),
                 message="itinerary required",
             )
-        return PlainTextResponse(content=it.itinerary_md, media_type="text/markdown")
+        etag = strong_etag("md", it.id, it.created_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        return PlainTextResponse(content=it.itinerary_md, media_type="text/markdown", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    @app.get("/api/calendar/feed", response_model=CalendarFeedResponse)
+    def calendar_feed_url(
+        x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+    ):
+        if not settings.calendar_feed_secret:
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "NOT_FOUND"),
+                message="not found",
+            )
+        user_id = sanitize_text(x_user_id or "anonymous")
+        query = urlencode({"user_id": user_id, "token": feed_token(user_id)})
+        return CalendarFeedResponse(url=f"/api/calendar/feed.ics?{query}")
+
+    @app.get("/api/calendar/feed.ics")
+    async def calendar_feed(
+        user_id: str = Query(),
+        token: str | None = Query(default=None),
+        db: AsyncSession = Depends(get_async_db),
+        if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    ):
+        # Calendar clients subscribe by URL and cannot send headers, so the signed token stands in for X-User-Id.
+        user_id = sanitize_text(user_id)
+        if not feed_token_valid(user_id, token):
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "NOT_FOUND"),
+                message="not found",
+            )
+        # Revalidation is by ETag only: the newest created_at is stamped before its job commits, so a Last-Modified
+        # date could predate an itinerary that becomes visible later and If-Modified-Since would hide it.
+        etag = await feed_etag(db, user_id)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return StreamingResponse(stream_user_calendar(user_id), media_type="text/calendar", headers=headers)
+
+    @app.get("/api/trips/{trip_id}/price_history", response_model=PriceHistoryResponse)
+    def get_price_history(
+        trip_id: str,
+        alert_type: Literal["flight", "hotel", "both"] = Query(default="flight", alias="type"),
+        granularity: Literal["hour", "day"] = "hour",
+        since: dt.datetime | None = None,
+        limit: int = Query(default=168, ge=1, le=2000),
+        db: Session = Depends(get_db),
+        x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+    ):
+        user_id = sanitize_text(x_user_id or "anonymous")
+        trip: Trip | None = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user_id).first()
+        if not trip:
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "TRIP_NOT_FOUND"),
+                message="trip not found",
+            )
+        q = db.query(PriceRollup).filter(
+            PriceRollup.trip_id == trip_id,
+            PriceRollup.alert_type == alert_type,
+            PriceRollup.granularity == granularity,
+        )
+        if since is not None:
+            q = q.filter(PriceRollup.bucket_start >= since)
+        rows = list(reversed(q.order_by(PriceRollup.bucket_start.desc()).limit(limit).all()))
+        return PriceHistoryResponse(
+            trip_id=trip_id,
+            alert_type=alert_type,
+            granularity=granularity,
+            buckets=[
+                PriceBucketDto(
+                    bucket_start=r.bucket_start,
+                    min_price=float(r.min_price),
+                    max_price=float(r.max_price),
+                    last_price=float(r.last_price),
+                    sample_count=int(r.sample_count),
+                )
+                for r in rows
+            ],
+        )
 
     @app.post("/api/alerts", response_model=AlertCreateResponse)
     def create_alert(
@@ -623,6 +865,7 @@ def create_app() -> FastAPI:
             threshold=float(payload.threshold),
             frequency_minutes=int(payload.frequency_minutes),
             last_checked_at=None,
+            next_check_at=dt.datetime.now(dt.timezone.utc),
             is_active=True,
         )
         db.add(alert)
@@ -661,6 +904,16 @@ def create_app() -> FastAPI:
         runs = db.query(AgentRun).filter(AgentRun.trip_id == trip_id).order_by(AgentRun.created_at.desc()).all()
         return AgentRunListResponse(runs=[AgentRunDto.model_validate(r) for r in runs])
 
+    @app.get("/api/debug/db/pool")
+    def debug_db_pool():
+        if not settings.dev_mode:
+            raise ApiException(
+                status_code=404,
+                error_code=make_error_code(ErrorCategory.VALIDATION, "NOT_FOUND"),
+                message="not found",
+            )
+        return pool_metrics()
+
     @app.get("/api/debug/runs/{run_id}", response_model=AgentRunDto)
     def debug_run(
         run_id: str,
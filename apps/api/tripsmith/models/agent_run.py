@@ -3,8 +3,10 @@ from __future__ import annotations
 import datetime as dt
 
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import JSON
 from sqlalchemy import String
+from sqlalchemy import text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
@@ -13,9 +15,10 @@ from tripsmith.models.base import Base
 
 class AgentRun(Base):
     __tablename__ = "agent_runs"
+    __table_args__ = (Index("ix_agent_runs_trip_created", "trip_id", text("created_at DESC")),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    trip_id: Mapped[str] = mapped_column(String(36), index=True)
+    trip_id: Mapped[str] = mapped_column(String(36))
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), index=True)
 
     phase: Mapped[str] = mapped_column(String(32), index=True)
@@ -25,4 +28,3 @@ class AgentRun(Base):
     model_info: Mapped[dict] = mapped_column(JSON)
     prompt_version: Mapped[str] = mapped_column(String(64))
     commit_hash: Mapped[str] = mapped_column(String(64))
-
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import datetime as dt
+import zlib
 
 from sqlalchemy import Boolean
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Numeric
+from sqlalchemy import SmallInteger
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -13,8 +16,20 @@ from sqlalchemy.orm import mapped_column
 from tripsmith.models.base import Base
 
 
+ALERT_SHARDS = 1024
+
+
+def alert_shard(alert_id: str) -> int:
+    return zlib.crc32(alert_id.encode("utf-8")) % ALERT_SHARDS
+
+
+def _default_shard(context) -> int:
+    return alert_shard(context.get_current_parameters()["id"])
+
+
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (Index("ix_alerts_shard_due", "is_active", "shard", "next_check_at", "id"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     trip_id: Mapped[str] = mapped_column(String(36), index=True)
@@ -22,5 +37,7 @@ class Alert(Base):
     threshold: Mapped[float] = mapped_column(Numeric)
     frequency_minutes: Mapped[int] = mapped_column(Integer)
     last_checked_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    next_check_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True))
     is_active: Mapped[bool] = mapped_column(Boolean)
+    shard: Mapped[int] = mapped_column(SmallInteger, default=_default_shard)
 
@@ -3,10 +3,12 @@ from __future__ import annotations
 import datetime as dt
 
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import JSON
 from sqlalchemy import String
 from sqlalchemy import Text
+from sqlalchemy import text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
@@ -15,12 +17,13 @@ from tripsmith.models.base import Base
 
 class Itinerary(Base):
     __tablename__ = "itineraries"
+    __table_args__ = (Index("ix_itineraries_trip_created", "trip_id", text("created_at DESC")),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    trip_id: Mapped[str] = mapped_column(String(36), index=True)
+    trip_id: Mapped[str] = mapped_column(String(36))
     plan_index: Mapped[int] = mapped_column(Integer)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True))
 
     itinerary_json: Mapped[dict] = mapped_column(JSON)
     itinerary_md: Mapped[str] = mapped_column(Text)
-
+    itinerary_ics: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
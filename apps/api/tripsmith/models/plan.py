@@ -3,9 +3,11 @@ from __future__ import annotations
 import datetime as dt
 
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import JSON
 from sqlalchemy import String
 from sqlalchemy import Text
+from sqlalchemy import text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
@@ -14,11 +16,14 @@ from tripsmith.models.base import Base
 
 class Plan(Base):
     __tablename__ = "plans"
+    __table_args__ = (Index("ix_plans_trip_created", "trip_id", text("created_at DESC")),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    trip_id: Mapped[str] = mapped_column(String(36), index=True)
+    trip_id: Mapped[str] = mapped_column(String(36))
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True))
 
     plans_json: Mapped[dict] = mapped_column(JSON)
     explain_md: Mapped[str] = mapped_column(Text)
-
+    candidates_json: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
+    # Reranked plans point at the generated plan holding the candidate set instead of copying it.
+    source_plan_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import DateTime
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from tripsmith.models.base import Base
+
+
+class PricePoint(Base):
+    __tablename__ = "price_points"
+    __table_args__ = (Index("ix_price_points_observed_at", "observed_at"),)
+
+    trip_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    alert_type: Mapped[str] = mapped_column(String(16), primary_key=True)
+    observed_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    price: Mapped[float] = mapped_column(Numeric)
+
+
+class PriceRollup(Base):
+    __tablename__ = "price_rollups"
+    __table_args__ = (Index("ix_price_rollups_granularity_bucket", "granularity", "bucket_start"),)
+
+    trip_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    alert_type: Mapped[str] = mapped_column(String(16), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    min_price: Mapped[float] = mapped_column(Numeric)
+    max_price: Mapped[float] = mapped_column(Numeric)
+    last_price: Mapped[float] = mapped_column(Numeric)
+    sample_count: Mapped[int] = mapped_column(Integer)
@@ -50,6 +50,12 @@ class RouteEstimate:
     minutes: int
 
 
+@dataclass(frozen=True)
+class RouteMatrix:
+    mode: str
+    minutes: list[list[int]]
+
+
 class FlightsProvider:
     async def search(self, *, origin: str, destination: str, start_date: str, end_date: str, travelers: int) -> list[FlightCandidate]:
         raise NotImplementedError
@@ -74,3 +80,6 @@ class RoutingProvider:
     async def estimate(self, *, from_point: GeoPoint, to_point: GeoPoint, mode: str) -> RouteEstimate:
         raise NotImplementedError
 
+    async def matrix(self, *, points: list[GeoPoint], mode: str) -> RouteMatrix:
+        raise NotImplementedError
+
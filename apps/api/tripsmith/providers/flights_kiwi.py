@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import datetime as dt
 
-import httpx
-
+from tripsmith.core.config import settings
+from tripsmith.core.http_client import HttpClientRegistry
 from tripsmith.providers.base import FlightCandidate
 
 
 class KiwiTequilaFlightsProvider:
-    def __init__(self, *, api_key: str):
+    def __init__(self, *, api_key: str, http: HttpClientRegistry):
         self.api_key = api_key
+        self.http = http
 
     async def search(self, *, origin: str, destination: str, start_date: str, end_date: str, travelers: int) -> list[FlightCandidate]:
         url = "https://tequila-api.kiwi.com/v2/search"
@@ -21,13 +22,12 @@ class KiwiTequilaFlightsProvider:
             "date_to": start.strftime("%d/%m/%Y"),
             "adults": travelers,
             "curr": "USD",
-            "limit": 20,
+            "limit": settings.kiwi_search_limit,
         }
         headers = {"apikey": self.api_key}
-        async with httpx.AsyncClient(timeout=12) as client:
-            resp = await client.get(url, params=params, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self.http.client_for(url).get(url, params=params, headers=headers, timeout=12)
+        resp.raise_for_status()
+        data = resp.json()
         items = data.get("data") or []
         results: list[FlightCandidate] = []
         for i, item in enumerate(items):
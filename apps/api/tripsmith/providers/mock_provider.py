@@ -5,10 +5,13 @@ import hashlib
 import math
 import random
 
+import numpy as np
+
 from tripsmith.providers.base import FlightCandidate
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import PoiCandidate
 from tripsmith.providers.base import RouteEstimate
+from tripsmith.providers.base import RouteMatrix
 from tripsmith.providers.base import StayCandidate
 from tripsmith.providers.base import WeatherDay
 
@@ -121,9 +124,26 @@ def _haversine_minutes(a: GeoPoint, b: GeoPoint, km_per_h: float) -> int:
     return max(1, minutes)
 
 
+def haversine_minutes_matrix(points: list[GeoPoint], km_per_h: float) -> list[list[int]]:
+    if not points:
+        return []
+    lat = np.radians(np.array([p.lat for p in points], dtype=np.float64))
+    lon = np.radians(np.array([p.lon for p in points], dtype=np.float64))
+    dlat = lat[None, :] - lat[:, None]
+    dlon = lon[None, :] - lon[:, None]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    km = 2 * 6371.0 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+    minutes = np.rint((km / max(1e-6, km_per_h)) * 60)
+    return np.maximum(1, minutes).astype(np.int64).tolist()
+
+
 class MockRoutingProvider:
     async def estimate(self, *, from_point: GeoPoint, to_point: GeoPoint, mode: str) -> RouteEstimate:
         speed = {"walk": 4.5, "drive": 28.0, "transit": 18.0}.get(mode, 12.0)
         minutes = _haversine_minutes(from_point, to_point, speed)
         return RouteEstimate(mode="estimate", minutes=minutes)
 
+    async def matrix(self, *, points: list[GeoPoint], mode: str) -> RouteMatrix:
+        speed = {"walk": 4.5, "drive": 28.0, "transit": 18.0}.get(mode, 12.0)
+        return RouteMatrix(mode="estimate", minutes=haversine_minutes_matrix(points, speed))
+
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import datetime as dt
 
-import httpx
-
+from tripsmith.core.http_client import HttpClientRegistry
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import WeatherDay
 
 
 class OpenMeteoWeatherProvider:
+    def __init__(self, *, http: HttpClientRegistry):
+        self.http = http
+
     async def forecast(self, *, center: GeoPoint, start_date: str, end_date: str) -> list[WeatherDay]:
         url = "https://api.open-meteo.com/v1/forecast"
         params = {
@@ -21,10 +23,9 @@ class OpenMeteoWeatherProvider:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.http.client_for(url).get(url, params=params, timeout=10)
+            resp.raise_for_status()
+            data = resp.json()
         except Exception:
             return _fallback_days(start_date=start_date, end_date=end_date)
 
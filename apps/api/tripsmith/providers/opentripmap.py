@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import httpx
-
+from tripsmith.core.http_client import HttpClientRegistry
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import PoiCandidate
 
 
 class OpenTripMapPoiProvider:
-    def __init__(self, *, api_key: str):
+    def __init__(self, *, api_key: str, http: HttpClientRegistry):
         self.api_key = api_key
+        self.http = http
 
     async def search(self, *, destination: str, center: GeoPoint, limit: int) -> list[PoiCandidate]:
         url = "https://api.opentripmap.com/0.1/en/places/radius"
@@ -21,10 +21,9 @@ class OpenTripMapPoiProvider:
             "format": "json",
             "rate": "2",
         }
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self.http.client_for(url).get(url, params=params, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
 
         results: list[PoiCandidate] = []
         for item in data:
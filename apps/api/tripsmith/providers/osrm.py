@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import math
 
-import httpx
-
+from tripsmith.core.http_client import HttpClientRegistry
 from tripsmith.providers.base import GeoPoint
 from tripsmith.providers.base import RouteEstimate
+from tripsmith.providers.base import RouteMatrix
+from tripsmith.providers.mock_provider import haversine_minutes_matrix
 
 
 class OsrmRoutingProvider:
-    def __init__(self, *, base_url: str = "http://router.project-osrm.org"):
+    def __init__(self, *, http: HttpClientRegistry, base_url: str = "http://router.project-osrm.org"):
+        self.http = http
         self.base_url = base_url.rstrip("/")
 
     async def estimate(self, *, from_point: GeoPoint, to_point: GeoPoint, mode: str) -> RouteEstimate:
@@ -17,10 +19,9 @@ class OsrmRoutingProvider:
         url = f"{self.base_url}/route/v1/{profile}/{from_point.lon},{from_point.lat};{to_point.lon},{to_point.lat}"
         params = {"overview": "false"}
         try:
-            async with httpx.AsyncClient(timeout=6) as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.http.client_for(url).get(url, params=params, timeout=6)
+            resp.raise_for_status()
+            data = resp.json()
             routes = data.get("routes") or []
             if not routes:
                 raise RuntimeError("no routes")
@@ -31,6 +32,36 @@ class OsrmRoutingProvider:
             minutes = _haversine_minutes(from_point, to_point, _speed_kmh(mode))
             return RouteEstimate(mode="estimate", minutes=minutes)
 
+    async def matrix(self, *, points: list[GeoPoint], mode: str) -> RouteMatrix:
+        if len(points) < 2:
+            return RouteMatrix(mode="estimate", minutes=haversine_minutes_matrix(points, _speed_kmh(mode)))
+        profile = "driving" if mode in ("drive", "transit") else "foot"
+        coords = ";".join(f"{p.lon},{p.lat}" for p in points)
+        url = f"{self.base_url}/table/v1/{profile}/{coords}"
+        params = {"annotations": "duration"}
+        try:
+            resp = await self.http.client_for(url).get(url, params=params, timeout=10)
+            resp.raise_for_status()
+            data = resp.json()
+            durations = data.get("durations") or []
+            if data.get("code") != "Ok" or len(durations) != len(points) or any(len(row or []) != len(points) for row in durations):
+                raise RuntimeError("no table")
+        except Exception:
+            return RouteMatrix(mode="estimate", minutes=haversine_minutes_matrix(points, _speed_kmh(mode)))
+        fallback: list[list[int]] | None = None
+        minutes: list[list[int]] = []
+        for i, row in enumerate(durations):
+            out_row: list[int] = []
+            for j, duration_s in enumerate(row or []):
+                if duration_s is None:
+                    if fallback is None:
+                        fallback = haversine_minutes_matrix(points, _speed_kmh(mode))
+                    out_row.append(fallback[i][j])
+                else:
+                    out_row.append(max(1, int(round(float(duration_s) / 60))))
+            minutes.append(out_row)
+        return RouteMatrix(mode=mode, minutes=minutes)
+
 
 def _speed_kmh(mode: str) -> float:
     return {"walk": 4.5, "drive": 28.0, "transit": 18.0}.get(mode, 12.0)
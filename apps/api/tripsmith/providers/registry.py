@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from tripsmith.core.config import settings
+from tripsmith.core.http_client import get_http_clients
 from tripsmith.providers.base import FlightsProvider
 from tripsmith.providers.base import PoiProvider
 from tripsmith.providers.base import RoutingProvider
@@ -26,7 +27,7 @@ def get_flights_provider() -> FlightsProvider:
     if settings.provider_flights == "duffel":
         return DuffelFlightsProvider()
     if settings.provider_flights == "kiwi" and settings.kiwi_tequila_api_key:
-        return KiwiTequilaFlightsProvider(api_key=settings.kiwi_tequila_api_key)
+        return KiwiTequilaFlightsProvider(api_key=settings.kiwi_tequila_api_key, http=get_http_clients())
     return MockFlightsProvider()
 
 
@@ -38,18 +39,18 @@ def get_stays_provider() -> StaysProvider:
 
 def get_poi_provider() -> PoiProvider:
     if settings.provider_poi == "opentripmap" and settings.opentripmap_api_key:
-        return OpenTripMapPoiProvider(api_key=settings.opentripmap_api_key)
+        return OpenTripMapPoiProvider(api_key=settings.opentripmap_api_key, http=get_http_clients())
     return MockPoiProvider()
 
 
 def get_weather_provider() -> WeatherProvider:
     if settings.provider_weather == "openmeteo":
-        return OpenMeteoWeatherProvider()
+        return OpenMeteoWeatherProvider(http=get_http_clients())
     return MockWeatherProvider()
 
 
 def get_routing_provider() -> RoutingProvider:
     if settings.provider_routing == "osrm":
-        return OsrmRoutingProvider()
+        return OsrmRoutingProvider(http=get_http_clients())
     return MockRoutingProvider()
 
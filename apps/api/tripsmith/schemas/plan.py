@@ -55,8 +55,11 @@ class PlanMetrics(BaseModel):
     daily_commute_minutes_estimate: int
 
 
+PlanLabel = Literal["cheap", "fast", "balanced"]
+
+
 class PlanOption(BaseModel):
-    label: Literal["cheap", "fast", "balanced"]
+    label: PlanLabel
     title: str
     flight: FlightSummary
     stay: StaySummary
@@ -70,6 +73,8 @@ class PlanOption(BaseModel):
 class PlansJson(BaseModel):
     generated_at: dt.datetime
     options: list[PlanOption]
+    alternatives: dict[PlanLabel, list[PlanOption]] = Field(default_factory=dict)
+    pareto: list[PlanOption] = Field(default_factory=list)
 
 
 class PlanCreateResponse(BaseModel):
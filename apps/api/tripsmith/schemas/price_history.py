@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class PriceBucketDto(BaseModel):
+    bucket_start: dt.datetime
+    min_price: float
+    max_price: float
+    last_price: float
+    sample_count: int
+
+
+class PriceHistoryResponse(BaseModel):
+    trip_id: str
+    alert_type: Literal["flight", "hotel", "both"]
+    granularity: Literal["hour", "day"]
+    buckets: list[PriceBucketDto]
@@ -4,23 +4,48 @@ import datetime as dt
 import hashlib
 import asyncio
 import os
+import weakref
 
 from celery import Celery
+from celery import group
+from celery.signals import worker_init
+from celery.signals import worker_process_shutdown
+from celery.signals import worker_shutdown
+from redis import Redis
+from sqlalchemy import and_
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from tripsmith.core.cache import ProviderCache
 from tripsmith.core.config import settings
 from tripsmith.core import db as db_core
 from tripsmith.core.errors import ErrorCategory
 from tripsmith.core.errors import make_error_code
+from tripsmith.core.http_client import close_http_clients
 from tripsmith.core.ids import new_id
+from tripsmith.core.job_progress import publish_job_result
+from tripsmith.core.job_progress import write_progress
 from tripsmith.core.logging import log_event
+from tripsmith.core.loop_runner import LoopRunner
+from tripsmith.core.metrics import job_stages
+from tripsmith.core.metrics import start_metrics_server
+from tripsmith.core.price_history import latest_hourly_prices
+from tripsmith.core.price_history import prune_expired_prices
+from tripsmith.core.price_history import record_prices
+from tripsmith.core.redis_client import get_async_redis
 from tripsmith.core.redis_client import get_redis
+from tripsmith.exports.ics import to_ics
+from tripsmith.models.alert import ALERT_SHARDS
 from tripsmith.models.alert import Alert
 from tripsmith.models.itinerary import Itinerary
 from tripsmith.models.job import Job
 from tripsmith.models.plan import Plan
 from tripsmith.models.trip import Trip
 from tripsmith.models.notification import Notification
+from tripsmith.schemas.jobs import JobDto
 
 
 celery_app = Celery(
@@ -38,81 +63,224 @@ celery_app.conf.beat_schedule = {
     "refresh-alerts": {
         "task": "tripsmith.refresh_alerts",
         "schedule": 60.0,
-    }
+    },
+    "prune-price-history": {
+        "task": "tripsmith.prune_price_history",
+        "schedule": 3600.0,
+    },
 }
 
 
+async def _run_async_job(make_coro):
+    redis = get_async_redis()
+    cache = ProviderCache(redis)
+    cache.start_invalidation_listener()
+    try:
+        return await make_coro(cache)
+    finally:
+        await cache.aclose()
+        await redis.aclose()
+        await close_http_clients()
+
+
+_loop_runner = LoopRunner(name="tripsmith-worker-loop")
+_SHARED_CACHES: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ProviderCache] = weakref.WeakKeyDictionary()
+
+
+async def _run_shared_job(make_coro):
+    loop = asyncio.get_running_loop()
+    cache = _SHARED_CACHES.get(loop)
+    if cache is None:
+        cache = ProviderCache(get_async_redis())
+        cache.start_invalidation_listener()
+        _SHARED_CACHES[loop] = cache
+    return await make_coro(cache)
+
+
+async def _close_shared_resources() -> None:
+    cache = _SHARED_CACHES.pop(asyncio.get_running_loop(), None)
+    if cache is not None:
+        await cache.aclose()
+        await cache.redis.aclose()
+    await close_http_clients()
+
+
+def _run_job_coroutine(make_coro):
+    if settings.worker_event_loop == "persistent":
+        return _loop_runner.run(_run_shared_job(make_coro))
+    return asyncio.run(_run_async_job(make_coro))
+
+
+@worker_init.connect
+def _start_metrics_exporter(**_kwargs) -> None:
+    # The worker runs a thread pool in one process, so the default registry sees every task.
+    if settings.worker_metrics_port > 0:
+        start_metrics_server(settings.worker_metrics_port)
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_loop_runner(**_kwargs) -> None:
+    _loop_runner.stop(_close_shared_resources)
+
+
 @celery_app.task(name="tripsmith.refresh_alerts")
 def refresh_alerts() -> int:
+    count = max(1, min(int(settings.alert_shard_count), ALERT_SHARDS))
+    bounds = [ALERT_SHARDS * i // count for i in range(count + 1)]
+    group(refresh_alert_shards.s(lo, hi) for lo, hi in zip(bounds, bounds[1:])).apply_async()
+    return count
+
+
+@celery_app.task(name="tripsmith.refresh_alert_shards")
+def refresh_alert_shards(first_shard: int, end_shard: int) -> int:
+    db: Session = db_core.SessionLocal()
+    try:
+        now = dt.datetime.now(dt.timezone.utc)
+        prices: dict[tuple, float] = {}
+        checked = 0
+        for shard in range(first_shard, end_shard):
+            after: tuple[dt.datetime, str] | None = None
+            while True:
+                rows = _claim_due_alerts(db, shard=shard, now=now, after=after, limit=settings.alert_batch_size)
+                if not rows:
+                    break
+                _refresh_alert_batch(db, rows, now=now, prices=prices)
+                checked += len(rows)
+                after = (rows[-1].next_check_at, rows[-1].id)
+        return checked
+    finally:
+        db.close()
+
+
+@celery_app.task(name="tripsmith.prune_price_history")
+def prune_price_history() -> dict[str, int]:
     db: Session = db_core.SessionLocal()
     try:
-        alerts = db.query(Alert).filter(Alert.is_active == True).all()  # noqa: E712
-        count = 0
-        for alert in alerts:
-            if _should_check(alert):
-                _check_one(db, alert)
-                count += 1
-        db.commit()
-        return count
+        return prune_expired_prices(db, now=dt.datetime.now(dt.timezone.utc))
     finally:
         db.close()
 
 
-def _should_check(alert: Alert) -> bool:
-    if alert.last_checked_at is None:
-        return True
-    next_at = alert.last_checked_at + dt.timedelta(minutes=int(alert.frequency_minutes))
-    return dt.datetime.now(dt.timezone.utc) >= next_at
+def _claim_due_alerts(
+    db: Session,
+    *,
+    shard: int,
+    now: dt.datetime,
+    after: tuple[dt.datetime, str] | None,
+    limit: int,
+) -> list:
+    q = (
+        select(
+            Alert.id,
+            Alert.trip_id,
+            Alert.type,
+            Alert.threshold,
+            Alert.frequency_minutes,
+            Alert.next_check_at,
+            Trip.origin,
+            Trip.destination,
+            Trip.start_date,
+            Trip.end_date,
+        )
+        .join(Trip, Trip.id == Alert.trip_id)
+        .where(Alert.is_active == True, Alert.shard == shard, Alert.next_check_at <= now)  # noqa: E712
+        .order_by(Alert.next_check_at, Alert.id)
+        .limit(limit)
+        # Rows stay locked until _refresh_alert_batch commits; overlapping ticks skip them instead of re-notifying.
+        .with_for_update(skip_locked=True, of=Alert)
+    )
+    if after is not None:
+        q = q.where(or_(Alert.next_check_at > after[0], and_(Alert.next_check_at == after[0], Alert.id > after[1])))
+    return list(db.execute(q).all())
 
 
-def _mock_price(alert: Alert) -> float:
-    basis = f"{alert.trip_id}|{alert.type}|{dt.datetime.now(dt.timezone.utc).strftime('%Y-%m-%d-%H')}"
+def _route_price(route: tuple, *, now: dt.datetime) -> float:
+    basis = "|".join([*(str(part) for part in route), now.strftime("%Y-%m-%d-%H")])
     h = hashlib.sha256(basis.encode("utf-8")).hexdigest()
     return float(int(h[:6], 16) % 500) + 80.0
 
 
-def _check_one(db: Session, alert: Alert) -> None:
-    price = _mock_price(alert)
-    alert.last_checked_at = dt.datetime.now(dt.timezone.utc)
-    trigger = price <= float(alert.threshold)
-    if not trigger:
-        return
-    payload = {
-        "trip_id": alert.trip_id,
-        "alert_type": alert.type,
-        "price": price,
-        "threshold": float(alert.threshold),
-        "checked_at": alert.last_checked_at.isoformat(),
-    }
-    n = Notification(
-        id=new_id(),
-        alert_id=alert.id,
-        created_at=dt.datetime.now(dt.timezone.utc),
-        channel="email",
-        payload_json=payload,
-        status="sent",
-    )
-    db.add(n)
-    log_event("notify_placeholder", alert_id=alert.id, trip_id=alert.trip_id, channel="email", payload=payload)
+def _refresh_alert_batch(db: Session, rows: list, *, now: dt.datetime, prices: dict[tuple, float]) -> int:
+    updates: list[dict] = []
+    notifications: list[dict] = []
+    known = latest_hourly_prices(db, {(row.trip_id, row.type) for row in rows}, now=now)
+    observed: dict[tuple[str, str], float] = {}
+    for row in rows:
+        route = (row.origin, row.destination, row.start_date, row.end_date, row.type)
+        price = known.get((row.trip_id, row.type))
+        if price is None:
+            price = prices.get(route)
+            if price is None:
+                price = prices[route] = _route_price(route, now=now)
+            observed[(row.trip_id, row.type)] = price
+        updates.append(
+            {
+                "id": row.id,
+                "last_checked_at": now,
+                "next_check_at": now + dt.timedelta(minutes=max(1, int(row.frequency_minutes))),
+            }
+        )
+        if price > float(row.threshold):
+            continue
+        notifications.append(
+            {
+                "id": new_id(),
+                "alert_id": row.id,
+                "created_at": now,
+                "channel": "email",
+                "payload_json": {
+                    "trip_id": row.trip_id,
+                    "alert_type": row.type,
+                    "price": price,
+                    "threshold": float(row.threshold),
+                    "checked_at": now.isoformat(),
+                },
+                "status": "sent",
+            }
+        )
+    db.execute(update(Alert), updates)
+    if notifications:
+        db.execute(insert(Notification), notifications)
+    record_prices(db, observed, observed_at=now)
+    db.commit()
+    for n in notifications:
+        log_event("notify_placeholder", alert_id=n["alert_id"], trip_id=n["payload_json"]["trip_id"], channel="email", payload=n["payload_json"])
+    return len(notifications)
 
 
-def _set_step(
-    db: Session,
-    job: Job,
-    *,
-    stage: str,
-    progress: int,
-    message: str,
-    result_json: dict | None = None,
-) -> None:
-    job.stage = stage[:32]
-    job.progress = int(progress)
-    job.message = message[:256]
-    if result_json is not None:
-        job.result_json = result_json
+_progress_redis: Redis | None = None
+
+
+def _job_redis() -> Redis:
+    global _progress_redis
+    if _progress_redis is None:
+        _progress_redis = get_redis()
+    return _progress_redis
+
+
+def _set_step(job: Job, *, stage: str, progress: int, message: str) -> None:
+    job_stages.enter(job_id=job.id, job_type=job.type, stage=stage)
+    write_progress(_job_redis(), job.id, status="running", stage=stage, progress=progress, message=message)
+
+
+def _finish_job(db: Session, job: Job, *, result_json: dict, rows: tuple = ()) -> None:
+    for row in rows:
+        db.add(row)
+    job.status = "succeeded"
+    job.stage = "COMPLETE"
+    job.progress = 100
+    job.message = "Complete"
+    job.result_json = result_json
+    job.error_code = None
+    job.error_message = None
+    job.next_action = None
     job.updated_at = dt.datetime.now(dt.timezone.utc)
     db.add(job)
+    result = JobDto.model_validate(job)
     db.commit()
+    job_stages.finish(job_id=job.id, status="succeeded")
+    publish_job_result(_job_redis(), result)
 
 
 def _fail_job(
@@ -132,7 +300,10 @@ def _fail_job(
     job.next_action = next_action[:256]
     job.updated_at = dt.datetime.now(dt.timezone.utc)
     db.add(job)
+    result = JobDto.model_validate(job)
     db.commit()
+    job_stages.finish(job_id=job.id, status="failed")
+    publish_job_result(_job_redis(), result)
 
 
 @celery_app.task(name="tripsmith.run_plan_job")
@@ -144,10 +315,7 @@ def run_plan_job(job_id: str) -> None:
         job: Job | None = db.query(Job).filter(Job.id == job_id).first()
         if not job:
             return
-        _set_step(db, job, stage="STARTING", progress=5, message="Starting job")
-        job.status = "running"
-        db.add(job)
-        db.commit()
+        _set_step(job, stage="STARTING", progress=5, message="Starting job")
 
         trip: Trip | None = db.query(Trip).filter(Trip.id == job.trip_id, Trip.user_id == job.user_id).first()
         if not trip:
@@ -169,8 +337,7 @@ def run_plan_job(job_id: str) -> None:
             )
             return
 
-        redis = get_redis()
-        _set_step(db, job, stage="FETCH_CANDIDATES", progress=20, message="Fetching candidates")
+        _set_step(job, stage="FETCH_CANDIDATES", progress=20, message="Fetching candidates")
 
         trip_dict = {
             "id": trip.id,
@@ -189,10 +356,12 @@ def run_plan_job(job_id: str) -> None:
             "constraints_confirmed_at": trip.constraints_confirmed_at,
         }
 
-        _set_step(db, job, stage="GENERATE", progress=45, message="Generating plans")
-        plans, explain_md, _tool_calls = asyncio.run(generate_plans(redis=redis, trip=trip_dict))
+        # Progress lives in Redis until the job ends; don't hold a transaction open across provider calls.
+        db.close()
+        _set_step(job, stage="GENERATE", progress=45, message="Generating plans")
+        plans, explain_md, _tool_calls, candidates = _run_job_coroutine(lambda cache: generate_plans(cache=cache, trip=trip_dict))
 
-        _set_step(db, job, stage="VALIDATE", progress=65, message="Validating output")
+        _set_step(job, stage="VALIDATE", progress=65, message="Validating output")
         if not getattr(plans, "options", None) or len(plans.options) < 3:  # type: ignore[attr-defined]
             _fail_job(
                 db,
@@ -203,7 +372,7 @@ def run_plan_job(job_id: str) -> None:
             )
             return
 
-        _set_step(db, job, stage="PERSIST", progress=80, message="Saving to database")
+        _set_step(job, stage="PERSIST", progress=80, message="Saving to database")
 
         plan_row = Plan(
             id=new_id(),
@@ -211,17 +380,9 @@ def run_plan_job(job_id: str) -> None:
             created_at=dt.datetime.now(dt.timezone.utc),
             plans_json=plans.model_dump(mode="json"),
             explain_md=explain_md,
+            candidates_json=candidates,
         )
-        db.add(plan_row)
-        db.commit()
-
-        _set_step(db, job, stage="COMPLETE", progress=100, message="Complete", result_json={"plan_id": plan_row.id})
-        job.status = "succeeded"
-        job.error_code = None
-        job.error_message = None
-        job.next_action = None
-        db.add(job)
-        db.commit()
+        _finish_job(db, job, result_json={"plan_id": plan_row.id}, rows=(plan_row,))
     except Exception as e:
         try:
             job = db.query(Job).filter(Job.id == job_id).first()
@@ -244,6 +405,7 @@ def run_plan_job(job_id: str) -> None:
         finally:
             return
     finally:
+        job_stages.forget(job_id)
         db.close()
 
 
@@ -257,10 +419,7 @@ def run_itinerary_job(job_id: str) -> None:
         job: Job | None = db.query(Job).filter(Job.id == job_id).first()
         if not job:
             return
-        _set_step(db, job, stage="STARTING", progress=5, message="Starting job")
-        job.status = "running"
-        db.add(job)
-        db.commit()
+        _set_step(job, stage="STARTING", progress=5, message="Starting job")
 
         trip: Trip | None = db.query(Trip).filter(Trip.id == job.trip_id, Trip.user_id == job.user_id).first()
         if not trip:
@@ -289,7 +448,6 @@ def run_itinerary_job(job_id: str) -> None:
 
         plan_index = int((job.result_json or {}).get("plan_index", 0))
         plans_json = PlansJson.model_validate(plan_row.plans_json)
-        redis = get_redis()
 
         trip_dict = {
             "id": trip.id,
@@ -308,10 +466,13 @@ def run_itinerary_job(job_id: str) -> None:
             "constraints_confirmed_at": trip.constraints_confirmed_at,
         }
 
-        _set_step(db, job, stage="GENERATE", progress=45, message="Generating daily itinerary")
-        itinerary_json, itinerary_md, _tool_calls = asyncio.run(generate_itinerary(redis=redis, trip=trip_dict, plan=plans_json, plan_index=plan_index))
+        db.close()
+        _set_step(job, stage="GENERATE", progress=45, message="Generating daily itinerary")
+        itinerary_json, itinerary_md, _tool_calls = _run_job_coroutine(
+            lambda cache: generate_itinerary(cache=cache, trip=trip_dict, plan=plans_json, plan_index=plan_index)
+        )
 
-        _set_step(db, job, stage="VALIDATE", progress=65, message="Validating output")
+        _set_step(job, stage="VALIDATE", progress=65, message="Validating output")
         if not getattr(itinerary_json, "days", None):  # type: ignore[attr-defined]
             _fail_job(
                 db,
@@ -322,37 +483,28 @@ def run_itinerary_job(job_id: str) -> None:
             )
             return
 
-        _set_step(db, job, stage="PERSIST", progress=80, message="Saving to database")
+        _set_step(job, stage="PERSIST", progress=80, message="Saving to database")
 
+        created_at = dt.datetime.now(dt.timezone.utc)
         it_row = Itinerary(
             id=new_id(),
             trip_id=trip.id,
             plan_index=plan_index,
-            created_at=dt.datetime.now(dt.timezone.utc),
+            created_at=created_at,
             itinerary_json=itinerary_json.model_dump(mode="json"),
             itinerary_md=itinerary_md,
+            itinerary_ics=to_ics(trip_id=trip.id, itinerary=itinerary_json, stamp=created_at),
         )
-        db.add(it_row)
-        db.commit()
-
-        _set_step(
+        _finish_job(
             db,
             job,
-            stage="COMPLETE",
-            progress=100,
-            message="Complete",
             result_json={
                 "itinerary_id": it_row.id,
                 "itinerary_json": itinerary_json.model_dump(mode="json"),
                 "itinerary_md": itinerary_md,
             },
+            rows=(it_row,),
         )
-        job.status = "succeeded"
-        job.error_code = None
-        job.error_message = None
-        job.next_action = None
-        db.add(job)
-        db.commit()
     except Exception as e:
         try:
             job = db.query(Job).filter(Job.id == job_id).first()
@@ -375,5 +527,6 @@ def run_itinerary_job(job_id: str) -> None:
         finally:
             return
     finally:
+        job_stages.forget(job_id)
         db.close()
 
@@ -12,6 +12,8 @@ type Options = {
   onFailed?: (job: JobDto) => void | Promise<void>
 }
 
+type JobProgress = Pick<JobDto, 'status' | 'stage' | 'progress' | 'message' | 'updated_at'>
+
 export function useJobPoll(jobId: string | null, opts: Options = {}) {
   const { enabled = true, intervalMs = 1000, onSucceeded, onFailed } = opts
   const [job, setJob] = useState<JobDto | null>(null)
@@ -22,32 +24,61 @@ export function useJobPoll(jobId: string | null, opts: Options = {}) {
   useEffect(() => {
     if (!enabled || !jobId) return
     let stopped = false
+    let pollId: ReturnType<typeof setInterval> | null = null
+    let source: EventSource | null = null
     const currentJobId = jobId
 
+    async function handle(j: JobDto) {
+      if (stopped) return
+      setJob(j)
+      setError(null)
+
+      if (j.status === 'succeeded') {
+        stopped = true
+        await callbacksRef.current.onSucceeded?.(j)
+      } else if (j.status === 'failed') {
+        stopped = true
+        await callbacksRef.current.onFailed?.(j)
+      }
+    }
+
     async function tick() {
       try {
-        const j = await api().getJob(currentJobId)
-        if (stopped) return
-        setJob(j)
-        setError(null)
-
-        if (j.status === 'succeeded') {
-          stopped = true
-          await callbacksRef.current.onSucceeded?.(j)
-        } else if (j.status === 'failed') {
-          stopped = true
-          await callbacksRef.current.onFailed?.(j)
-        }
+        await handle(await api().getJob(currentJobId))
       } catch (e) {
         if (!stopped) setError(e)
       }
     }
 
-    const id = setInterval(() => void tick(), intervalMs)
-    void tick()
+    function startPolling() {
+      if (stopped || pollId) return
+      pollId = setInterval(() => void tick(), intervalMs)
+      void tick()
+    }
+
+    if (typeof EventSource === 'undefined') {
+      startPolling()
+    } else {
+      source = new EventSource(api().jobEventsUrl(currentJobId))
+      source.addEventListener('job', (ev) => {
+        void handle(JSON.parse((ev as MessageEvent).data) as JobDto)
+        if (stopped) source?.close()
+      })
+      source.addEventListener('progress', (ev) => {
+        if (stopped) return
+        const p = JSON.parse((ev as MessageEvent).data) as JobProgress
+        setJob((prev) => (prev ? { ...prev, ...p } : prev))
+      })
+      source.onerror = () => {
+        source?.close()
+        startPolling()
+      }
+    }
+
     return () => {
       stopped = true
-      clearInterval(id)
+      source?.close()
+      if (pollId) clearInterval(pollId)
     }
   }, [enabled, intervalMs, jobId])
 
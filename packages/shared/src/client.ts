@@ -137,6 +137,9 @@ export function createApiClient(opts: ApiClientOptions) {
         method: 'GET'
       }), retry),
 
+    jobEventsUrl: (jobId: string) =>
+      `${opts.baseUrl.replace(/\/$/, '')}/api/jobs/${jobId}/events?user_id=${encodeURIComponent(opts.userId)}`,
+
     createPlan: (tripId: string) =>
       withRetry(() => requestJson<JobCreateResponse>(opts, `/api/trips/${tripId}/plan`, {
         method: 'POST'
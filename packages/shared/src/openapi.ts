@@ -80,8 +80,10 @@ export type PlanMetrics = {
   daily_commute_minutes_estimate: number
 }
 
+export type PlanLabel = 'cheap' | 'fast' | 'balanced'
+
 export type PlanOption = {
-  label: 'cheap' | 'fast' | 'balanced'
+  label: PlanLabel
   title: string
   flight: FlightSummary
   stay: StaySummary
@@ -95,6 +97,8 @@ export type PlanOption = {
 export type PlansJson = {
   generated_at: string
   options: PlanOption[]
+  alternatives?: Partial<Record<PlanLabel, PlanOption[]>>
+  pareto?: PlanOption[]
 }
 
 export type PlanCreateResponse = {